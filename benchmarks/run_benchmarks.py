@@ -0,0 +1,471 @@
+# run_benchmarks.py
+"""
+Offline load test and latency benchmark for the chatbot API and the resume
+parser API.
+
+Both FastAPI apps run in-process (httpx's ASGI transport, no sockets)
+against the local stand-ins in standins.py: an in-memory MongoDB, a fake
+chat model with configurable latency and a fake embedding model. Text
+extraction in the resume parser stays real; only the model is replaced.
+
+Scenarios:
+  query              POST /query under concurrent load
+  query_stream       POST /query/stream; also reports time to first byte
+  add_alumni         POST /alumni under concurrent load
+  update_embeddings  POST /update-embeddings after inserting a batch of
+                     alumni directly into MongoDB, sequentially
+  rebuild_index      POST /update-embeddings?full=true, sequentially
+  parse_resume       POST /parse-resume/ with the sample PDF
+
+Writes a JSON report (latency percentiles, throughput, status codes and,
+for chatbot scenarios, the server-side per-stage breakdown). Data, questions
+and model outputs are seeded, so reports from different commits are
+comparable; pass --compare to diff against an earlier report.
+
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/run_benchmarks.py --output before.json
+    (change something)
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARKS_DIR)
+CHATBOT_DIR = os.path.join(REPO_ROOT, "chatbot-api")
+RESUME_DIR = os.path.join(REPO_ROOT, "resume_parsing")
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from standins import install_chatbot_standins, install_resume_standins  # noqa: E402
+
+CHATBOT_SCENARIOS = ("query", "query_stream", "add_alumni", "update_embeddings", "rebuild_index")
+SCENARIOS = CHATBOT_SCENARIOS + ("parse_resume",)
+
+FIRST_NAMES = ["Arjun", "Priya", "Rahul", "Sneha", "Vikram", "Ananya", "Karthik", "Meera", "Rohan", "Divya",
+               "Aditya", "Kavya", "Siddharth", "Ishita", "Nikhil", "Pooja", "Varun", "Neha", "Amit", "Riya"]
+LAST_NAMES = ["Sharma", "Patel", "Kumar", "Reddy", "Singh", "Iyer", "Nair", "Gupta", "Joshi", "Mehta",
+              "Rao", "Das", "Verma", "Kapoor", "Bose", "Menon", "Shah", "Pillai", "Chopra", "Agarwal"]
+QUESTION_TEMPLATES = [
+    "Who works at {company}?",
+    "Which alumni graduated in {graduation_year}?",
+    "Find alumni skilled in {skill}",
+    "Tell me about {name}",
+    "Who are the {profession}s in {location}?",
+    "Which alumni know {skill} and work at {company}?",
+    "Show me alumni from the {department} department",
+]
+
+
+# ---------------------------------------------------------------- data
+
+def generate_alumni(count: int, rng: random.Random, offset: int = 0) -> List[Dict[str, Any]]:
+    """Alumni records varied from the sample data templates"""
+    sys.path.insert(0, CHATBOT_DIR)
+    from setup_sample_data import SAMPLE_ALUMNI_DATA
+
+    records = []
+    for number in range(offset, offset + count):
+        template = rng.choice(SAMPLE_ALUMNI_DATA)
+        other = rng.choice(SAMPLE_ALUMNI_DATA)
+        skills = list({*template["skills"], *rng.sample(other["skills"], min(2, len(other["skills"])))})
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}"
+        records.append({
+            "name": name,
+            "profession": template["profession"],
+            "company": rng.choice([template["company"], other["company"]]),
+            "graduation_year": rng.randint(2008, 2024),
+            "degree": template["degree"],
+            "department": template["department"],
+            "skills": sorted(skills),
+            "email": f"{name.lower().replace(' ', '.')}@example.com",
+            "location": rng.choice([template["location"], other["location"]]),
+            "experience_years": rng.randint(0, 15),
+        })
+    return records
+
+
+def generate_questions(count: int, alumni: List[Dict[str, Any]], rng: random.Random) -> List[str]:
+    questions = []
+    for _ in range(count):
+        record = rng.choice(alumni)
+        values = dict(record, skill=rng.choice(record["skills"]))
+        questions.append(rng.choice(QUESTION_TEMPLATES).format(**values))
+    return questions
+
+
+# ---------------------------------------------------------------- measurement
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Linear-interpolated percentile of already sorted values"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """Milliseconds"""
+    values = sorted(latency * 1000 for latency in latencies)
+    summary = {name: percentile(values, fraction) for name, fraction in
+               (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99))}
+    summary.update(min=values[0] if values else None, max=values[-1] if values else None,
+                   mean=sum(values) / len(values) if values else None)
+    return {name: round(value, 3) if value is not None else None for name, value in summary.items()}
+
+
+async def drive(send: Callable[[int], Awaitable[Dict[str, Any]]], requests: int, concurrency: int,
+                warmup: int = 0) -> Dict[str, Any]:
+    """Run send(i) requests from `concurrency` workers; returns the latency/throughput report.
+
+    send returns {"status": int} plus optional extra timings in seconds
+    (e.g. "ttfb"), which are summarized like the latency.
+    """
+    for i in range(warmup):
+        await send(-1 - i)
+
+    next_request = iter(range(requests))
+    latencies, extras, statuses, errors = [], {}, Counter(), []
+
+    async def worker():
+        for i in next_request:
+            started = time.perf_counter()
+            try:
+                result = await send(i)
+            except Exception as e:
+                statuses["exception"] += 1
+                errors.append(repr(e))
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[str(result.pop("status"))] += 1
+            for name, value in result.items():
+                extras.setdefault(name, []).append(value)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    failed = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    report = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(requests / duration, 3) if duration else None,
+        "errors": failed,
+        "status_codes": dict(statuses),
+        "latency_ms": latency_summary(latencies),
+    }
+    for name, values in extras.items():
+        report[f"{name}_ms"] = latency_summary(values)
+    if errors:
+        report["error_samples"] = errors[:5]
+    return report
+
+
+def stage_breakdown(before: Dict, after: Dict) -> Dict[str, Dict[str, float]]:
+    """Server-side stage timings observed between two Histogram.totals() readings"""
+    stages = {}
+    for key, (total, count) in after.items():
+        previous_total, previous_count = before.get(key, (0.0, 0))
+        if count > previous_count:
+            stages[key[0]] = {
+                "count": count - previous_count,
+                "mean_ms": round((total - previous_total) / (count - previous_count) * 1000, 3),
+                "total_ms": round((total - previous_total) * 1000, 3),
+            }
+    return dict(sorted(stages.items(), key=lambda item: -item[1]["total_ms"]))
+
+
+# ---------------------------------------------------------------- chatbot API
+
+@asynccontextmanager
+async def chatbot_client(args, workdir: str):
+    """The chatbot app, started with its lifespan, over an in-process transport"""
+    os.environ.setdefault("VECTORSTORE_DIR", os.path.join(workdir, "vectorstore_data"))
+    os.environ.setdefault("SESSION_BACKEND", "memory")
+    mongo = install_chatbot_standins(
+        llm_latency=args.llm_latency, llm_token_latency=args.llm_token_latency,
+        llm_tokens=args.llm_tokens, embedding_latency=args.embedding_latency
+    )
+    rng = random.Random(args.seed)
+    alumni = generate_alumni(args.alumni, rng)
+    created_at = datetime(2024, 1, 1)
+    collection = mongo[os.getenv("DB_NAME", "alumni_db")][os.getenv("COLLECTION_NAME", "alumni")]
+    collection.insert_many([dict(record, created_at=created_at) for record in alumni])
+
+    sys.path.insert(0, CHATBOT_DIR)
+    started = time.perf_counter()
+    import main
+    import_seconds = time.perf_counter() - started
+    logging.getLogger().setLevel(args.log_level)
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://chatbot", timeout=None) as client:
+            # The service initializes and warms up in the background after startup
+            while (await client.get("/health/ready")).status_code != 200:
+                await asyncio.sleep(0.01)
+            startup = {"import_seconds": round(import_seconds, 3),
+                       "ready_seconds": round(time.perf_counter() - started, 3)}
+            yield client, main.rag_service, collection, alumni, startup
+
+
+async def run_chatbot_scenarios(args, scenarios: List[str], workdir: str) -> Dict[str, Any]:
+    results = {}
+    async with chatbot_client(args, workdir) as (client, service, collection, alumni, startup):
+        results["startup"] = dict(startup, alumni=len(alumni), **service.startup)
+        rng = random.Random(args.seed + 1)
+        # Separate question sets, so one scenario does not warm the answer cache for the next
+        questions = {name: generate_questions(args.requests, alumni, random.Random(f"{args.seed}-{name}"))
+                     for name in ("query", "query_stream", "warmup")}
+
+        def question(scenario, i):
+            return questions[scenario][i % args.requests] if i >= 0 else questions["warmup"][-1 - i]
+        new_alumni = generate_alumni(args.requests + args.update_rounds * args.update_batch, rng, offset=len(alumni))
+
+        async def query(i):
+            response = await client.post("/query", json={
+                "question": question("query", i), "session_id": f"bench-{i % args.sessions}"
+            })
+            return {"status": response.status_code}
+
+        async def query_stream(i):
+            started = time.perf_counter()
+            first_byte = None
+            async with client.stream("POST", "/query/stream", json={
+                "question": question("query_stream", i), "session_id": f"bench-stream-{i % args.sessions}"
+            }) as response:
+                async for _ in response.aiter_bytes():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+            return {"status": response.status_code, "ttfb": first_byte or 0.0}
+
+        async def add_alumni(i):
+            record = new_alumni[i] if i >= 0 else generate_alumni(1, rng, offset=10_000_000 - i)[0]
+            response = await client.post("/alumni", json=record)
+            return {"status": response.status_code}
+
+        next_batch = iter(range(args.requests, len(new_alumni), args.update_batch))
+
+        async def update_embeddings(i):
+            start = next(next_batch)
+            now = datetime.now()
+            collection.insert_many([
+                dict(record, created_at=now + timedelta(microseconds=offset))
+                for offset, record in enumerate(new_alumni[start:start + args.update_batch])
+            ])
+            response = await client.post("/update-embeddings")
+            return {"status": response.status_code}
+
+        async def rebuild_index(i):
+            response = await client.post("/update-embeddings", params={"full": "true"})
+            return {"status": response.status_code}
+
+        plans = {
+            "query": (query, args.requests, args.concurrency, args.warmup),
+            "query_stream": (query_stream, args.requests, args.concurrency, args.warmup),
+            "add_alumni": (add_alumni, args.requests, args.concurrency, 0),
+            "update_embeddings": (update_embeddings, args.update_rounds, 1, 0),
+            "rebuild_index": (rebuild_index, args.rebuild_rounds, 1, 0),
+        }
+        for name in scenarios:
+            send, requests, concurrency, warmup = plans[name]
+            print(f"⏱️  {name}: {requests} requests, concurrency {concurrency}", file=sys.stderr)
+            stages_before = service.stage_seconds.totals()
+            builds_before = service.index_build_seconds.totals()
+            cache_before = (service.answer_cache.hits, service.answer_cache.misses)
+            results[name] = await drive(send, requests, concurrency, warmup)
+            results[name]["answer_cache"] = {"hits": service.answer_cache.hits - cache_before[0],
+                                             "misses": service.answer_cache.misses - cache_before[1]}
+            results[name]["server_stages"] = stage_breakdown(stages_before, service.stage_seconds.totals())
+            builds = stage_breakdown(builds_before, service.index_build_seconds.totals())
+            if builds:
+                results[name]["index_builds"] = builds
+        results["index"] = {"vectors": service.vectorstore.index.ntotal, **service.index_stats}
+    return results
+
+
+# ---------------------------------------------------------------- resume parser API
+
+async def run_resume_scenario(args) -> Dict[str, Any]:
+    sys.path.insert(0, RESUME_DIR)
+    # The parser reads its prompt template relative to the working directory
+    previous_dir = os.getcwd()
+    os.chdir(RESUME_DIR)
+    try:
+        try:
+            import resume_parser
+            import app as resume_app
+        except ImportError as e:
+            return {"skipped": f"resume_parsing dependencies are not installed ({e})"}
+        install_resume_standins(resume_parser, model_latency=args.resume_model_latency)
+
+        with open(os.path.join(RESUME_DIR, "samples", "AadityaKumar.pdf"), "rb") as f:
+            sample = f.read()
+        transport = httpx.ASGITransport(app=resume_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://resume", timeout=None) as client:
+            async def parse(i):
+                response = await client.post(
+                    "/parse-resume/", files={"file": ("resume.pdf", sample, "application/pdf")}
+                )
+                return {"status": response.status_code}
+
+            print(f"⏱️  parse_resume: {args.resume_requests} requests, concurrency {args.concurrency}",
+                  file=sys.stderr)
+            return await drive(parse, args.resume_requests, args.concurrency, warmup=1)
+    finally:
+        os.chdir(previous_dir)
+
+
+# ---------------------------------------------------------------- reports
+
+def git_revision() -> Dict[str, Any]:
+    def git(*command):
+        return subprocess.run(["git", *command], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "HEAD") or None,
+                "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Relative change of p50, p99 and throughput per scenario; flags regressions beyond threshold"""
+    comparison = {"baseline_commit": baseline.get("meta", {}).get("git", {}).get("commit"),
+                  "config_matches": baseline.get("meta", {}).get("config") == report["meta"]["config"],
+                  "threshold": threshold, "scenarios": {}, "regressions": []}
+    for name, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or "latency_ms" not in result or "latency_ms" not in previous:
+            continue
+        changes = {}
+        for metric in ("p50", "p99"):
+            old, new = previous["latency_ms"].get(metric), result["latency_ms"].get(metric)
+            if old and new is not None:
+                changes[f"{metric}_ms"] = {"before": old, "after": new, "change": round(new / old - 1, 4)}
+                if new / old - 1 > threshold:
+                    comparison["regressions"].append(f"{name} {metric} +{new / old - 1:.1%}")
+        old, new = previous.get("throughput_rps"), result.get("throughput_rps")
+        if old and new is not None:
+            changes["throughput_rps"] = {"before": old, "after": new, "change": round(new / old - 1, 4)}
+            if 1 - new / old > threshold:
+                comparison["regressions"].append(f"{name} throughput -{1 - new / old:.1%}")
+        comparison["scenarios"][name] = changes
+    return comparison
+
+
+def print_summary(report: Dict[str, Any]):
+    print(f"\n{'scenario':<18} {'rps':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>7}", file=sys.stderr)
+    for name, result in report["scenarios"].items():
+        if "latency_ms" not in result:
+            print(f"{name:<18} {result.get('skipped', '')}", file=sys.stderr)
+            continue
+        latency = result["latency_ms"]
+        print(f"{name:<18} {result['throughput_rps'] or 0:>9.1f} {latency['p50'] or 0:>9.1f} "
+              f"{latency['p90'] or 0:>9.1f} {latency['p99'] or 0:>9.1f} {result['errors']:>7}", file=sys.stderr)
+    comparison = report.get("comparison")
+    if comparison:
+        if not comparison["config_matches"]:
+            print("⚠️  Baseline was run with a different configuration", file=sys.stderr)
+        for name, changes in comparison["scenarios"].items():
+            described = ", ".join(f"{metric} {change['change']:+.1%}" for metric, change in changes.items())
+            print(f"   {name}: {described}", file=sys.stderr)
+        if comparison["regressions"]:
+            print(f"❌ Regressions: {', '.join(comparison['regressions'])}", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--alumni", type=int, default=2000, help="Alumni seeded before the run")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests before query scenarios")
+    parser.add_argument("--sessions", type=int, default=50, help="Distinct conversation sessions")
+    parser.add_argument("--update-rounds", type=int, default=5)
+    parser.add_argument("--update-batch", type=int, default=100, help="Alumni inserted before each update")
+    parser.add_argument("--rebuild-rounds", type=int, default=2)
+    parser.add_argument("--resume-requests", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Fake LLM time to first token (s)")
+    parser.add_argument("--llm-token-latency", type=float, default=0.002, help="Fake LLM time per token (s)")
+    parser.add_argument("--llm-tokens", type=int, default=40, help="Tokens per fake answer")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="Fake embedding time per text (s)")
+    parser.add_argument("--resume-model-latency", type=float, default=0.2, help="Fake resume model time (s)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    parser.add_argument("--regression-threshold", type=float, default=0.10,
+                        help="Relative slowdown that counts as a regression with --compare")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> Dict[str, Any]:
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    config = {name: value for name, value in vars(args).items() if name not in ("output", "compare", "log_level")}
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": config,
+        },
+        "scenarios": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="alumni-bench-") as workdir:
+        chatbot_scenarios = [name for name in scenarios if name in CHATBOT_SCENARIOS]
+        if chatbot_scenarios:
+            results = await run_chatbot_scenarios(args, chatbot_scenarios, workdir)
+            report["chatbot"] = {"startup": results.pop("startup"), "index": results.pop("index")}
+            report["scenarios"].update(results)
+        if "parse_resume" in scenarios:
+            report["scenarios"]["parse_resume"] = await run_resume_scenario(args)
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+    report = asyncio.run(run(args))
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f), args.regression_threshold)
+    print_summary(report)
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"📄 Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    if report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
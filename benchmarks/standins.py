@@ -0,0 +1,195 @@
+# standins.py
+"""
+Local stand-ins for the services the APIs depend on, so benchmarks run
+offline and deterministically:
+
+  MongoDB       an in-memory mongomock client
+  Ollama        FakeChatModel, with configurable time to first token and
+                per-token latency, and token usage reported like Ollama's
+  HuggingFace   FakeEmbeddings, hash-seeded unit vectors with an optional
+                per-text cost
+  TinyLlama     FakeTokenizer / FakeCausalLM for the resume parser
+
+install_chatbot_standins() must run before chatbot (or main) is imported,
+since they import the client classes by name.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from functools import partial
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model: the answer is drawn from the prompt's own words"""
+
+    model: str = "benchmark-fake"
+    temperature: float = 0.0
+    latency: float = 0.05        # Seconds before the first token
+    token_latency: float = 0.002  # Seconds per generated token
+    tokens: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake-chat"
+
+    def _answer(self, messages: List[BaseMessage]) -> Tuple[List[str], int]:
+        prompt = "\n".join(str(message.content) for message in messages)
+        words = prompt.split() or ["no", "data"]
+        rng = random.Random(_seed(prompt))
+        return [rng.choice(words) for _ in range(self.tokens)], len(words)
+
+    def _result(self, answer: List[str], prompt_tokens: int) -> ChatResult:
+        message = AIMessage(
+            content=" ".join(answer),
+            usage_metadata={"input_tokens": prompt_tokens, "output_tokens": len(answer),
+                            "total_tokens": prompt_tokens + len(answer)}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        answer, prompt_tokens = self._answer(messages)
+        time.sleep(self.latency + self.token_latency * len(answer))
+        return self._result(answer, prompt_tokens)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        answer, prompt_tokens = self._answer(messages)
+        await asyncio.sleep(self.latency + self.token_latency * len(answer))
+        return self._result(answer, prompt_tokens)
+
+    def _chunks(self, answer: List[str], prompt_tokens: int) -> Iterator[ChatGenerationChunk]:
+        for position, token in enumerate(answer):
+            last = position == len(answer) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=token if last else token + " ",
+                usage_metadata={"input_tokens": prompt_tokens, "output_tokens": len(answer),
+                                "total_tokens": prompt_tokens + len(answer)} if last else None
+            ))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        answer, prompt_tokens = self._answer(messages)
+        time.sleep(self.latency)
+        for chunk in self._chunks(answer, prompt_tokens):
+            time.sleep(self.token_latency)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        answer, prompt_tokens = self._answer(messages)
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(answer, prompt_tokens):
+            await asyncio.sleep(self.token_latency)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic unit vectors seeded by the text's hash"""
+
+    def __init__(self, model_name: Optional[str] = None, size: int = 384, latency_per_text: float = 0.0, **kwargs):
+        self.model_name = model_name
+        self.size = size
+        self.latency_per_text = latency_per_text
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.random.default_rng(_seed(text)).standard_normal(self.size).astype("float32")
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_per_text:
+            time.sleep(self.latency_per_text * len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def install_chatbot_standins(llm_latency: float = 0.05, llm_token_latency: float = 0.002, llm_tokens: int = 40,
+                             embedding_latency: float = 0.0):
+    """Point the chatbot's MongoDB, Ollama and HuggingFace clients at the stand-ins"""
+    if "chatbot" in sys.modules:
+        raise RuntimeError("install_chatbot_standins() must run before chatbot is imported")
+    try:
+        import mongomock
+    except ImportError as e:
+        raise RuntimeError("The benchmarks need mongomock: pip install -r benchmarks/requirements.txt") from e
+    import pymongo
+    import langchain_ollama
+    import langchain_huggingface
+
+    client = mongomock.MongoClient()
+    pymongo.MongoClient = lambda *args, **kwargs: client
+    langchain_ollama.ChatOllama = partial(
+        FakeChatModel, latency=llm_latency, token_latency=llm_token_latency, tokens=llm_tokens
+    )
+    langchain_huggingface.HuggingFaceEmbeddings = partial(FakeEmbeddings, latency_per_text=embedding_latency)
+    return client
+
+
+class _FakeSequence:
+    """Token ids of a generated sequence; slicing keeps the decoded text"""
+
+    def __init__(self, text: str, length: int):
+        self.text = text
+        self.shape = (1, length)
+
+    def __getitem__(self, item):
+        return self
+
+    def to(self, device):
+        return self
+
+
+class FakeTokenizer:
+    eos_token_id = 0
+
+    def apply_chat_template(self, messages, return_tensors=None, add_generation_prompt=False):
+        text = "\n".join(message["content"] for message in messages)
+        return _FakeSequence(text, len(text.split()))
+
+    def decode(self, ids, skip_special_tokens=True) -> str:
+        return ids.text
+
+
+class FakeCausalLM:
+    """Returns a fixed, valid resume JSON after a configurable delay"""
+
+    device = "cpu"
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+
+    def generate(self, input_ids, **kwargs):
+        time.sleep(self.latency)
+        profile = {
+            "name": "Benchmark Candidate",
+            "email": "candidate@example.com",
+            "phone": "+91-9000000000",
+            "skills": ["python", " machine learning ", "sql"],
+            "experience": [{"job_title": "Engineer", "company": "Example", "duration": "2 years"}],
+            "projects": [], "education": [], "courses": [],
+            "social_media": {"linkedin": "https://linkedin.com/in/candidate", "github": "not a url"}
+        }
+        return [_FakeSequence(f"Here is the JSON:\n{json.dumps(profile)}\n", input_ids.shape[1])]
+
+
+def install_resume_standins(resume_parser_module, model_latency: float = 0.2):
+    """Replace the resume parser's TinyLlama tokenizer and model (text extraction stays real)"""
+    resume_parser_module.tokenizer = FakeTokenizer()
+    resume_parser_module.model = FakeCausalLM(latency=model_latency)
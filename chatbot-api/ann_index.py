@@ -0,0 +1,222 @@
+# ann_index.py
+"""
+FAISS index construction for the alumni vector store.
+
+FAISS_INDEX_TYPE selects the index family:
+  flat      exact search, every vector held in full (default)
+  ivf_flat  inverted lists over full vectors, probes FAISS_NPROBE lists
+  ivf_pq    inverted lists over product-quantized codes (FAISS_PQ_M bytes/vector)
+  hnsw      graph search (FAISS_HNSW_M links/node)
+Only flat indexes can remove vectors; IVF and HNSW ones keep removed
+vectors until the next full rebuild.
+
+Writers do not copy the whole index: a SegmentedIndex shares the published
+base index and appends to a small flat delta, which is merged back into
+one index whenever the index is snapshotted to disk.
+FAISS_VECTOR_ENCODING=float16 stores flat, IVF and HNSW vectors as float16.
+Builds report recall@k against exact search (RecallProbe) next to query
+latency, to weigh FAISS_NPROBE / FAISS_EF_SEARCH settings.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# k-means wants roughly this many training points per IVF list
+TRAINING_POINTS_PER_LIST = 39
+# PQ codebooks have 256 centroids per subquantizer
+PQ_MIN_TRAINING_POINTS = 256
+
+
+def needs_training(index_type: str) -> bool:
+    return index_type in ("ivf_flat", "ivf_pq")
+
+
+def default_nlist(num_vectors: int) -> int:
+    """Usual sqrt-scaled list count, capped by the available training points"""
+    return max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // TRAINING_POINTS_PER_LIST))
+
+
+def factory_string(index_type: str, encoding: str, dimension: int, nlist: int = 1,
+                   pq_m: int = 48, hnsw_m: int = 32) -> str:
+    """faiss.index_factory description for the configured index"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS_INDEX_TYPE {index_type!r}, expected one of {INDEX_TYPES}")
+    storage = "SQfp16" if encoding == "float16" else "Flat"
+
+    if index_type == "flat":
+        return storage
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},{storage}"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m}" + (",SQfp16" if encoding == "float16" else "")
+
+    # PQ subquantizers must evenly divide the vector dimension
+    while dimension % pq_m:
+        pq_m -= 1
+    return f"IVF{nlist},PQ{pq_m}"
+
+
+def build_index(factory: str, dimension: int, training_vectors: Optional[List[List[float]]] = None):
+    """Create (and train, if required) an empty L2 index"""
+    index = faiss.index_factory(dimension, factory, faiss.METRIC_L2)
+    if not index.is_trained:
+        started = time.perf_counter()
+        index.train(np.asarray(training_vectors, dtype="float32"))
+        logger.info(f"Trained {factory} index on {len(training_vectors)} vectors in {time.perf_counter() - started:.2f}s")
+    return index
+
+
+def configure_search(index, nprobe: int, ef_search: int):
+    """Apply query-time parameters that are not always persisted with the index"""
+    parameters = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        try:
+            parameters.set_index_parameter(index, name, value)
+        except RuntimeError:
+            pass  # Not applicable to this index type
+
+
+def read_index_mmap(path: str):
+    """Map an index file read-only so processes share it through the page cache.
+
+    Flat, scalar-quantized and HNSW vector storage is used in place; IVF
+    inverted lists are still read into memory. Returns None if this faiss
+    build cannot map index files.
+    """
+    flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+    if flag is None:
+        return None
+    return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+
+
+def copy_index(index, mapped: bool = False):
+    """Deep copy of an index that owns its memory.
+
+    clone_index would keep views onto a memory-mapped index's storage, so
+    mapped indexes are copied through serialization instead.
+    """
+    if mapped:
+        return faiss.deserialize_index(faiss.serialize_index(index))
+    return faiss.clone_index(index)
+
+
+class SegmentedIndex(faiss.IndexShards):
+    """A read-only base index and a flat delta of vectors added since, searched as one.
+
+    Delta positions follow on from the base's. The base is never modified,
+    so copies share it and only copy the delta. FAISS cannot serialize
+    this index; save merged() instead.
+    """
+
+    # Declared so faiss' attribute guard lets instances set them
+    base = None
+    delta = None
+
+    def __init__(self, base, delta=None):
+        super().__init__(base.d, False, True)  # Shards searched in turn, with successive ids
+        self.base = base
+        self.delta = delta if delta is not None else faiss.IndexFlat(base.d, base.metric_type)
+        self.add_shard(self.base)
+        self.add_shard(self.delta)
+
+    def add(self, x):
+        """Append vectors to the delta"""
+        self.delta.add(x)
+        self.syncWithSubIndexes()
+
+    def copy(self) -> "SegmentedIndex":
+        """Copy sharing the base; only the delta is copied"""
+        return SegmentedIndex(self.base, faiss.clone_index(self.delta))
+
+    def merged(self, mapped: bool = False):
+        """One index holding the base's vectors followed by the delta's"""
+        index = copy_index(self.base, mapped)
+        if self.delta.ntotal:
+            index.add(self.delta.reconstruct_n(0, self.delta.ntotal))
+        return index
+
+
+def base_index(index):
+    """The index a SegmentedIndex builds on, or index itself"""
+    return index.base if isinstance(index, SegmentedIndex) else index
+
+
+def supports_removal(index) -> bool:
+    """Whether removing vectors renumbers the rest, as FAISS.delete assumes.
+
+    Flat indexes compact their storage; IVF remove_ids leaves the other
+    vectors at their old ids and HNSW graphs cannot drop vectors at all.
+    """
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlatCodes)
+
+
+class RecallProbe:
+    """recall@k of an index against exact search, measured while it is built.
+
+    The queries are perturbed copies of vectors from the first batch, so
+    their true neighbours are not simply the vectors they came from. Each
+    batch added to the index is also searched exhaustively at full
+    precision, which leaves the exact top k for every query at the end
+    without keeping a copy of the vectors.
+    """
+
+    def __init__(self, k: int, size: int = 100, noise: float = 0.5, seed: int = 0):
+        self.k = k
+        self.size = size
+        # Perturbation length, relative to the mean vector length
+        self.noise = noise
+        self._rng = np.random.default_rng(seed)
+        self.queries: Optional[np.ndarray] = None
+        self._distances: Optional[np.ndarray] = None
+        self._doc_ids: Optional[np.ndarray] = None
+
+    def add(self, doc_ids: List[str], vectors: List[List[float]]):
+        """Track the exact neighbours among a batch of vectors added to the index"""
+        vectors = np.asarray(vectors, dtype="float32")
+        if not len(vectors):
+            return
+        if self.queries is None:
+            picks = self._rng.choice(len(vectors), min(self.size, len(vectors)), replace=False)
+            scale = self.noise * float(np.linalg.norm(vectors, axis=1).mean()) / math.sqrt(vectors.shape[1])
+            noise = self._rng.normal(0, scale, (len(picks), vectors.shape[1]))
+            self.queries = np.ascontiguousarray(vectors[picks] + noise, dtype="float32")
+            self._distances = np.empty((len(picks), 0), dtype="float32")
+            self._doc_ids = np.empty((len(picks), 0), dtype=object)
+
+        distances, positions = faiss.knn(self.queries, vectors, min(self.k, len(vectors)))
+        distances = np.concatenate([self._distances, distances], axis=1)
+        doc_ids = np.concatenate([self._doc_ids, np.asarray(doc_ids, dtype=object)[positions]], axis=1)
+        best = np.argsort(distances, axis=1)[:, :self.k]
+        self._distances = np.take_along_axis(distances, best, axis=1)
+        self._doc_ids = np.take_along_axis(doc_ids, best, axis=1)
+
+    def evaluate(self, index, index_to_docstore_id: Dict[int, str]) -> Dict[str, Any]:
+        """recall@k and single-query latency of index over the probe queries"""
+        if self.queries is None:
+            return {}
+
+        recalls = []
+        latencies = []
+        for query, expected in zip(self.queries, self._doc_ids):
+            started = time.perf_counter()
+            _, positions = index.search(query[None, :], self.k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found = {index_to_docstore_id.get(int(position)) for position in positions[0] if position >= 0}
+            recalls.append(len(found & set(expected)) / len(expected))
+
+        latencies.sort()
+        return {
+            f"recall_at_{self.k}": round(float(np.mean(recalls)), 4),
+            "query_latency_p50_ms": round(latencies[len(latencies) // 2], 3),
+            "query_latency_p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+            "probes": len(self.queries)
+        }
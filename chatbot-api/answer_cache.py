@@ -0,0 +1,74 @@
+# answer_cache.py
+"""
+LRU + TTL cache of chatbot answers.
+
+Entries are keyed on the normalized question and the vector store version
+they were generated against, so any index change makes them unreachable.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_question(question: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question"""
+    return re.sub(r"\s+", " ", question).strip().rstrip("?!. ").lower()
+
+
+class AnswerCache:
+    """Thread-safe answer cache bounded by entry count and age"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, question: str, index_version: int) -> Optional[str]:
+        """Cached answer for question at index_version, if still fresh"""
+        key = (normalize_question(question), index_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, question: str, index_version: int, answer: str):
+        """Store an answer, evicting the least recently used overflow"""
+        if self.max_entries <= 0:
+            return
+        key = (normalize_question(question), index_version)
+        with self._lock:
+            self._entries[key] = (answer, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries (called when the index changes)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since startup and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl
+            }
@@ -1,26 +1,132 @@
 # rag_service.py
 from langchain_ollama import ChatOllama
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableWithMessageHistory
+from langchain_core.runnables import RunnableLambda, RunnableWithMessageHistory
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.documents import Document
 from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure
 import os
+import glob
 import json
+import pickle
+import asyncio
+import time
+import uuid
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import partial
+from itertools import chain, islice
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, AsyncIterator, NamedTuple
 import logging
-from contextlib import asynccontextmanager
+import threading
+from contextlib import asynccontextmanager, contextmanager
 from bson.objectid import ObjectId
+import faiss
+import numpy as np
+from embedding_cache import CachedEmbeddings
+from onnx_embeddings import ONNXEmbeddings, default_model_file
+from answer_cache import AnswerCache, normalize_question
+from single_flight import AsyncSingleFlight, SingleFlight
+from docstore import LayeredDocstore, PositionMap, SQLiteDocstore, docstore_contains, docstore_items
+from session_store import create_session_store
+from shared_index import SharedIndexVersion
+from index_wal import IndexWAL
+from lexical_index import BM25Index
+from query_planner import QueryPlanner
+from health_checks import HealthMonitor
+from metrics import MetricsRegistry
+from request_trace import current_trace
+import embedding_pool
+import ann_index
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Vectors are keyed by the MongoDB _id of the alumni document they embed
+INDEX_ID_SCHEME = "mongo_id"
+PLACEHOLDER_ID = "__placeholder__"
+TOMBSTONE_ID = "__removed__"
+
+# Document timestamps the index watermark follows
+WATERMARK_FIELDS = ("updated_at", "created_at")
+
+# Reciprocal rank fusion constant (Cormack et al.)
+RRF_K = 60
+
+
+class IndexSnapshot(NamedTuple):
+    """One published version of the index. Never modified once published:
+    writers build the next version from copies and swap the reference."""
+    vectorstore: FAISS
+    lexical_index: BM25Index
+    version: int
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Times LLM generations (and their first token) and counts their tokens"""
+    
+    run_inline = True
+    
+    def __init__(self, record_stage, tokens_total):
+        self.record_stage = record_stage
+        self.tokens_total = tokens_total
+        self._runs = {}  # run_id -> [started, first token seen, streamed tokens]
+        self._lock = threading.Lock()
+    
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        with self._lock:
+            self._runs[run_id] = [time.perf_counter(), False, 0]
+    
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        with self._lock:
+            self._runs[run_id] = [time.perf_counter(), False, 0]
+    
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return
+            run[2] += 1
+            first_token = not run[1]
+            run[1] = True
+        if first_token:
+            self.record_stage("llm_first_token", time.perf_counter() - run[0])
+    
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        self.record_stage("llm_generation", time.perf_counter() - run[0])
+        
+        message = getattr(response.generations[0][0], "message", None) if response.generations else None
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            prompt_tokens, completion_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+            self.tokens_total.inc(prompt_tokens, kind="prompt")
+        else:
+            prompt_tokens, completion_tokens = None, run[2] or None
+        if completion_tokens:
+            self.tokens_total.inc(completion_tokens, kind="completion")
+        
+        trace = current_trace()
+        if trace is not None:
+            trace.note(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+
 class AlumniRAGService:
     _instance = None
     _initialized = False
@@ -40,19 +146,213 @@ class AlumniRAGService:
         self.collection_name = os.getenv('COLLECTION_NAME', 'alumni')
         self.model_name = os.getenv('OLLAMA_MODEL', 'llama3:8b')
         self.embeddings_model = os.getenv('EMBEDDINGS_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+        # "torch" (sentence-transformers) or "onnx" (onnxruntime on CPU, int8 export by default)
+        self.embeddings_backend = os.getenv('EMBEDDINGS_BACKEND', 'torch')
+        self.embeddings_onnx_file = os.getenv('EMBEDDINGS_ONNX_FILE') or None
         
-        # Initialize components
-        self._initialize_mongodb()
-        self._initialize_llm_and_embeddings()
-        self._initialize_vectorstore()
-        self._setup_conversation_chain()
+        self.vectorstore_dir = os.getenv('VECTORSTORE_DIR', 'vectorstore_data')
+        self.embedding_batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', '256'))
+        self.embedding_workers = int(os.getenv('EMBEDDING_WORKERS', '1'))
+        self.retrieval_k = int(os.getenv('RETRIEVAL_K', '4'))
+        self.retrieval_candidates = int(os.getenv('RETRIEVAL_CANDIDATES', '10'))
+        self.structured_max_results = int(os.getenv('STRUCTURED_MAX_RESULTS', '15'))
+        self.structured_scan_limit = int(os.getenv('STRUCTURED_SCAN_LIMIT', '10000'))
+        self.faiss_index_type = os.getenv('FAISS_INDEX_TYPE', 'flat')
+        self.faiss_vector_encoding = os.getenv('FAISS_VECTOR_ENCODING', 'float32')
+        self.faiss_nlist = int(os.getenv('FAISS_NLIST', '0'))  # 0 derives it from the collection size
+        self.faiss_pq_m = int(os.getenv('FAISS_PQ_M', '48'))
+        self.faiss_hnsw_m = int(os.getenv('FAISS_HNSW_M', '32'))
+        self.faiss_nprobe = int(os.getenv('FAISS_NPROBE', '16'))
+        self.faiss_ef_search = int(os.getenv('FAISS_EF_SEARCH', '64'))
+        self.faiss_training_sample = int(os.getenv('FAISS_TRAINING_SAMPLE', '50000'))
+        self.faiss_mmap = os.getenv('FAISS_MMAP', 'false').lower() in ('1', 'true', 'yes')
+        self._mapped_index = None
+        self.docstore_backend = os.getenv('DOCSTORE_BACKEND', 'pickle')  # or "sqlite"
+        self.index_refresh_interval = float(os.getenv('INDEX_REFRESH_INTERVAL', '30'))
+        self.max_index_staleness = float(os.getenv('INDEX_MAX_STALENESS', '300'))
+        self.index_sync_interval = float(os.getenv('INDEX_SYNC_INTERVAL', '2'))
+        # API writes go to a log; the full index is snapshotted at most this
+        # often, or once the log grows past INDEX_LOG_MAX_BYTES (0 = every write)
+        self.index_snapshot_interval = float(os.getenv('INDEX_SNAPSHOT_INTERVAL', '60'))
+        self.index_log_max_bytes = int(os.getenv('INDEX_LOG_MAX_BYTES', str(64 * 1024 * 1024)))
+        # Writes append to a delta index that is merged into the base index at
+        # each snapshot, or once it holds this many vectors
+        self.index_delta_max_vectors = int(os.getenv('INDEX_DELTA_MAX_VECTORS', '10000'))
         
-        # Session store for conversations
-        self.conversation_store = {}
-        self.last_update = datetime.min
+        self.max_concurrent_queries = int(os.getenv('MAX_CONCURRENT_QUERIES', '8'))
+        self._query_slots = asyncio.Semaphore(self.max_concurrent_queries)
+        self.queries_in_flight = 0
+        self.queries_completed = 0
+        
+        # Serializes index writers (refresher, API writes) within this process;
+        # shared_index extends that across worker processes. Readers never take
+        # it: they read the current IndexSnapshot reference once and use that.
+        self._index_lock = threading.RLock()
+        self.answer_cache = AnswerCache(
+            max_entries=int(os.getenv('ANSWER_CACHE_SIZE', '256')),
+            ttl=float(os.getenv('ANSWER_CACHE_TTL', '600'))
+        )
+        # Identical questions asked concurrently from sessions without history
+        # share one retrieval and generation
+        self.coalesce_queries = os.getenv('QUERY_COALESCING', 'true').lower() in ('1', 'true', 'yes')
+        self._flights = SingleFlight()
+        self._async_flights = AsyncSingleFlight()
+        
+        # Construction does no I/O; initialize() connects and loads the index,
+        # warm_up() exercises both models, and only then is the service ready
+        self._created_at = time.perf_counter()
+        self._startup_lock = threading.RLock()
+        self.components_initialized = False
+        self.ready = False
+        self.warm_up_model = os.getenv('WARM_UP_MODEL', 'true').lower() in ('1', 'true', 'yes')
+        self.startup = {"state": "created", "attempts": 0, "error": None, "initialize_seconds": None,
+                        "warm_up_seconds": None, "time_to_ready_seconds": None}
+        
+        self._setup_metrics()
+        
+        # Component checks run in the background; health endpoints read their results
+        self.health = HealthMonitor(
+            interval=float(os.getenv('HEALTH_CHECK_INTERVAL', '15')),
+            max_age=float(os.getenv('HEALTH_CHECK_MAX_AGE')) if os.getenv('HEALTH_CHECK_MAX_AGE') else None
+        )
+        self._health_probe_vector = None
+        self.health.register("mongodb", self._check_mongodb)
+        self.health.register("embeddings", self._check_embeddings)
+        self.health.register("vectorstore", self._check_vectorstore)
         
         self._initialized = True
-        logger.info("Alumni RAG Service initialized successfully")
+        logger.info("Alumni RAG Service created")
+    
+    def initialize(self):
+        """Connect to MongoDB, load the models and load or build the index; idempotent"""
+        with self._startup_lock:
+            if self.components_initialized:
+                return
+            self.startup.update(state="initializing", attempts=self.startup["attempts"] + 1, error=None)
+            started = time.perf_counter()
+            try:
+                self._initialize_mongodb()
+                self._initialize_llm_and_embeddings()
+                self._initialize_vectorstore()
+                self._setup_conversation_chain()
+                
+                # Structured filters are pushed down to MongoDB before vector search
+                self.query_planner = QueryPlanner(self.collection)
+                self._planner_version = None
+                self.refresh_query_planner()
+                
+                # Session store for conversations. SQLite by default: it is shared by
+                # every worker (uvicorn --workers N), so a conversation keeps its
+                # history whichever worker answers it
+                self.conversation_store = create_session_store(
+                    os.getenv('SESSION_BACKEND', 'sqlite'),
+                    path=os.getenv('SESSION_STORE_PATH', os.path.join(self.vectorstore_dir, 'sessions.db')),
+                    max_sessions=int(os.getenv('SESSION_MAX_SESSIONS', '10000')),
+                    ttl=float(os.getenv('SESSION_TTL', '3600')),
+                    max_messages=int(os.getenv('SESSION_MAX_MESSAGES', '50')),
+                    max_bytes=int(os.getenv('SESSION_MAX_BYTES', str(64 * 1024 * 1024)))
+                )
+            except Exception as e:
+                self.startup.update(state="failed", error=str(e))
+                raise
+            
+            self.components_initialized = True
+            self.startup["initialize_seconds"] = round(time.perf_counter() - started, 3)
+            logger.info(f"Alumni RAG Service initialized in {self.startup['initialize_seconds']}s")
+    
+    def warm_up(self):
+        """One embedding call and one model ping, so the first request pays for neither model load"""
+        with self._startup_lock:
+            self.initialize()
+            if self.ready:
+                return
+            self.startup["state"] = "warming_up"
+            started = time.perf_counter()
+            try:
+                # Independent of each other; the embedding bypasses the cache so the model really runs
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    embedding = pool.submit(self.embeddings.underlying.embed_query, "warm up")
+                    ping = pool.submit(self.llm.invoke, "Reply with OK.") if self.warm_up_model else None
+                    self._health_probe_vector = embedding.result()
+                    if ping is not None:
+                        ping.result()
+            except Exception as e:
+                self.startup.update(state="failed", error=f"Warm-up failed: {e}")
+                raise
+            
+            self.ready = True
+            self.startup.update(
+                state="ready",
+                warm_up_seconds=round(time.perf_counter() - started, 3),
+                time_to_ready_seconds=round(time.perf_counter() - self._created_at, 3)
+            )
+            logger.info(f"Alumni RAG Service ready: {self.startup}")
+    
+    def start(self) -> "AlumniRAGService":
+        """initialize() and warm_up(), for scripts that use the service directly"""
+        self.warm_up()
+        return self
+    
+    def _setup_metrics(self):
+        """Prometheus metrics for each pipeline stage, served at /metrics"""
+        self.metrics = MetricsRegistry()
+        self.stage_seconds = self.metrics.histogram(
+            "alumni_rag_stage_duration_seconds", "Duration of each RAG pipeline stage", ["stage"]
+        )
+        self.query_seconds = self.metrics.histogram(
+            "alumni_rag_query_duration_seconds", "End-to-end time to answer a question", ["mode"]
+        )
+        self.queries_total = self.metrics.counter(
+            "alumni_rag_queries_total", "Questions handled, by mode and outcome", ["mode", "outcome"]
+        )
+        self.llm_tokens_total = self.metrics.counter(
+            "alumni_rag_llm_tokens_total", "LLM tokens processed, by kind (prompt or completion)", ["kind"]
+        )
+        self.index_build_seconds = self.metrics.histogram(
+            "alumni_rag_index_build_seconds", "Duration of full index rebuilds and incremental updates", ["kind"]
+        )
+        self.documents_embedded_total = self.metrics.counter(
+            "alumni_rag_documents_embedded_total", "Documents embedded for indexing"
+        )
+        self.coalesced_queries_total = self.metrics.counter(
+            "alumni_rag_coalesced_queries_total",
+            "Questions answered by joining an identical in-flight generation, by mode", ["mode"]
+        )
+        # Read at scrape time; ones whose component is not initialized yet are skipped
+        self.metrics.gauge("alumni_rag_index_vectors", "Vectors in the current index",
+                           lambda: self._current.vectorstore.index.ntotal)
+        self.metrics.gauge("alumni_rag_index_version", "Index version being served", lambda: self.index_version)
+        self.metrics.gauge("alumni_rag_index_staleness_seconds", "Seconds since the index was last brought up to date",
+                           self.index_staleness)
+        self.metrics.gauge("alumni_rag_index_pending_log_bytes", "Index changes logged but not yet snapshotted",
+                           lambda: self.index_log.size())
+        self.metrics.gauge("alumni_rag_sessions", "Active conversation sessions", lambda: len(self.conversation_store))
+        self.metrics.gauge("alumni_rag_queries_in_flight", "Generations currently running",
+                           lambda: self.queries_in_flight)
+        self.metrics.gauge("alumni_rag_coalescing_flights", "Generations that identical questions can currently join",
+                           lambda: len(self._flights) + len(self._async_flights))
+        self.metrics.gauge("alumni_rag_ready", "1 once the service is initialized and warmed up",
+                           lambda: int(self.ready))
+        self.metrics.counter_callback("alumni_rag_answer_cache_hits_total", "Answer cache hits",
+                                      lambda: self.answer_cache.hits)
+        self.metrics.counter_callback("alumni_rag_answer_cache_misses_total", "Answer cache misses",
+                                      lambda: self.answer_cache.misses)
+    
+    def _record_stage(self, stage: str, seconds: float):
+        """Observe a stage duration, also in the current request's trace if one is active"""
+        self.stage_seconds.observe(seconds, stage=stage)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_stage(stage, seconds)
+    
+    @contextmanager
+    def _timed(self, stage: str):
+        """Record the duration of the with-block as a pipeline stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record_stage(stage, time.perf_counter() - started)
     
     def _initialize_mongodb(self):
         """Initialize MongoDB connection"""
@@ -66,12 +366,29 @@ class AlumniRAGService:
         except ConnectionFailure as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
+        
+        # Every branch of the changed-documents query needs an index, or the
+        # refresh check and each API write's pending-changes check scan the collection
+        try:
+            for field in WATERMARK_FIELDS:
+                self.collection.create_index(field)
+        except OperationFailure as e:
+            logger.warning(f"Could not create watermark indexes: {e}")
     
     def _initialize_llm_and_embeddings(self):
         """Initialize LLM and embeddings"""
         try:
-            self.llm = ChatOllama(model=self.model_name, temperature=0.3)
-            self.embeddings = HuggingFaceEmbeddings(model_name=self.embeddings_model)
+            self.llm = ChatOllama(
+                model=self.model_name,
+                temperature=0.3,
+                callbacks=[LLMMetricsHandler(self._record_stage, self.llm_tokens_total)]
+            )
+            self.embeddings = CachedEmbeddings(
+                self._embeddings_factory()(),
+                model_name=self.embeddings_id,
+                path=os.getenv('EMBEDDING_CACHE_PATH', os.path.join(self.vectorstore_dir, 'embedding_cache.db')),
+                max_entries=int(os.getenv('EMBEDDING_CACHE_SIZE', '100000'))
+            )
             logger.info("LLM and embeddings initialized")
         except Exception as e:
             logger.error(f"Failed to initialize LLM/embeddings: {e}")
@@ -79,68 +396,604 @@ class AlumniRAGService:
     
     def _initialize_vectorstore(self):
         """Initialize or load vector store"""
-        self.vectorstore_path = f"vectorstore_{self.collection_name}"
+        self.vectorstore_name = f"vectorstore_{self.collection_name}"
+        self.vectorstore_path = os.path.join(self.vectorstore_dir, self.vectorstore_name)
         
-        if self._vectorstore_exists():
-            logger.info("Loading existing vector store...")
-            self.vectorstore = self._load_vectorstore()
-        else:
-            logger.info("Creating new vector store...")
-            self.vectorstore = self._create_new_vectorstore()
+        self.shared_index = SharedIndexVersion(self.vectorstore_path)
+        self.index_log = IndexWAL(
+            f"{self.vectorstore_path}.wal",
+            fsync=os.getenv('INDEX_LOG_FSYNC', 'true').lower() in ('1', 'true', 'yes')
+        )
+        # Snapshot the live index was loaded from and how much of its log is applied
+        self._snapshot_id = None
+        self._log_offset = 0
+        
+        # Watermark of the newest Mongo change already present in the index
+        self.last_update = datetime.min
+        self.last_indexed_id = None
         
-        self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 5})
+        # Workers starting together wait here rather than all building the index
+        with self.shared_index.writer_lock():
+            published_metadata = self._load_index_metadata()
+            if self._vectorstore_exists():
+                logger.info("Loading existing vector store...")
+                vectorstore = self._load_vectorstore()
+                replayed = self._replay_index_log(vectorstore)
+                if replayed:
+                    logger.info(f"Replayed {replayed} logged index changes")
+            else:
+                logger.info("Creating new vector store...")
+                vectorstore = self._create_new_vectorstore()
+            
+            # A rebuild at startup replaces the index other workers serve
+            if self._load_index_metadata() != published_metadata:
+                version = self.shared_index.publish()
+            else:
+                version = self.shared_index.current()
+            self._remove_old_docstores(vectorstore)
+        
+        self.index_fresh_as_of = time.time()
+        self._publish(vectorstore, self._build_lexical_index(vectorstore), version)
+    
+    # The current snapshot's parts, for callers that need only one of them
+    @property
+    def vectorstore(self):
+        return self._current.vectorstore
+    
+    @property
+    def lexical_index(self) -> BM25Index:
+        return self._current.lexical_index
+    
+    @property
+    def index_version(self) -> int:
+        return self._current.version
     
     def _vectorstore_exists(self) -> bool:
         """Check if vector store files exist"""
         return (os.path.exists(f"{self.vectorstore_path}.faiss") and 
-                os.path.exists(f"{self.vectorstore_path}.pkl"))
+                (os.path.exists(f"{self.vectorstore_path}.pkl") or
+                 os.path.exists(f"{self.vectorstore_path}.meta.json")))
     
     def _load_vectorstore(self):
         """Load existing FAISS vector store"""
         try:
-            return FAISS.load_local(
-                self.vectorstore_path, 
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
+            metadata = self._load_index_metadata()
+            if metadata.get("id_scheme") != INDEX_ID_SCHEME:
+                # Older indexes were built with random ids and cannot be
+                # updated incrementally, so rebuild them once.
+                logger.info("Vector store predates stable ids, rebuilding...")
+                return self._create_new_vectorstore()
+            if metadata.get("embeddings", self.embeddings_model) != self.embeddings_id:
+                # Mixing vectors of two models or backends would skew similarities
+                logger.info(f"Vector store was embedded with {metadata.get('embeddings', self.embeddings_model)}, "
+                            f"rebuilding with {self.embeddings_id}...")
+                return self._create_new_vectorstore()
+            if metadata.get("docstore_backend", "pickle") != self.docstore_backend:
+                logger.info(f"Vector store docstore is not {self.docstore_backend}, rebuilding...")
+                return self._create_new_vectorstore()
+            
+            vectorstore = self._read_vectorstore(metadata)
+            ann_index.configure_search(vectorstore.index, self.faiss_nprobe, self.faiss_ef_search)
+            self.index_stats = self._describe_index(vectorstore)
+            self._restore_watermark(metadata)
+            self._snapshot_id, self._log_offset = metadata.get("snapshot_id"), 0
+            return vectorstore
         except Exception as e:
             logger.warning(f"Failed to load existing vector store: {e}")
             return self._create_new_vectorstore()
     
+    def _read_vectorstore(self, metadata: Dict[str, Any]):
+        """Read the saved index, memory-mapping it read-only if FAISS_MMAP is set"""
+        index = None
+        if self.faiss_mmap:
+            index = ann_index.read_index_mmap(f"{self.vectorstore_path}.faiss")
+            if index is not None:
+                self._mapped_index = index
+                logger.info("Memory-mapped vector index read-only")
+            else:
+                logger.warning("This faiss build cannot memory-map indexes; loading into memory")
+        
+        if metadata.get("docstore_backend") == "sqlite":
+            if index is None:
+                index = faiss.read_index(f"{self.vectorstore_path}.faiss")
+            docstore = SQLiteDocstore(os.path.join(self.vectorstore_dir, metadata["docstore_file"]))
+            index_to_docstore_id = docstore.load_mapping(index.ntotal)
+            if len(index_to_docstore_id) < index.ntotal:
+                raise ValueError(f"Docstore maps {len(index_to_docstore_id)} of {index.ntotal} vectors")
+            return FAISS(self.embeddings, index, docstore, PositionMap(index_to_docstore_id))
+        
+        if index is not None:
+            with open(f"{self.vectorstore_path}.pkl", "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            return self._layered(FAISS(self.embeddings, index, docstore, index_to_docstore_id))
+        
+        return self._layered(FAISS.load_local(
+            self.vectorstore_dir,
+            self.embeddings,
+            index_name=self.vectorstore_name,
+            allow_dangerous_deserialization=True
+        ))
+    
+    @staticmethod
+    def _layered(vectorstore):
+        """Convert an unpickled docstore and mapping to the types writes can copy cheaply"""
+        vectorstore.docstore = LayeredDocstore(vectorstore.docstore._dict)
+        vectorstore.index_to_docstore_id = PositionMap(vectorstore.index_to_docstore_id)
+        return vectorstore
+    
+    @staticmethod
+    def _watermark_fields(last_update: datetime, last_indexed_id: Optional[ObjectId]) -> Dict[str, Any]:
+        """A watermark as saved in index metadata and index log entries"""
+        return {
+            "last_update": last_update.isoformat(),
+            "last_indexed_id": str(last_indexed_id) if last_indexed_id else None
+        }
+    
+    def _restore_watermark(self, metadata: Dict[str, Any]):
+        """Set the watermark saved with the index (or an index log entry)"""
+        self.last_update = datetime.fromisoformat(metadata["last_update"])
+        last_indexed_id = metadata.get("last_indexed_id")
+        self.last_indexed_id = ObjectId(last_indexed_id) if last_indexed_id else None
+    
+    def _load_index_metadata(self) -> Dict[str, Any]:
+        """Load the watermark file stored next to the index"""
+        try:
+            with open(f"{self.vectorstore_path}.meta.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
     def _create_new_vectorstore(self):
         """Create new FAISS vector store from MongoDB data"""
-        documents = self._fetch_all_documents()
-        if not documents:
-            documents = ["No alumni data available."]
+        started = time.perf_counter()
+        index_type = self.faiss_index_type
+        vectorstore = None
+        if ann_index.needs_training(index_type):
+            vectorstore = self._new_trained_vectorstore()
+            if vectorstore is None:
+                index_type = "flat"
+        
+        last_update, last_indexed_id = datetime.min, None
+        probe = ann_index.RecallProbe(self.retrieval_candidates)
+        for docs, vectors in self._embed_in_batches(self._iter_documents()):
+            if vectorstore is None:
+                dimension = len(vectors[0])
+                factory = ann_index.factory_string(
+                    index_type, self.faiss_vector_encoding, dimension,
+                    pq_m=self.faiss_pq_m, hnsw_m=self.faiss_hnsw_m
+                )
+                vectorstore = self._new_vectorstore(ann_index.build_index(factory, dimension))
+            self._add_embedded_documents(vectorstore, docs, vectors)
+            last_update, last_indexed_id = self._compute_watermark(docs, last_update, last_indexed_id)
+            probe.add([str(doc["_id"]) for doc in docs], vectors)
+        
+        if vectorstore is None:
+            placeholder = "No alumni data available."
+            vector = self.embeddings.embed_documents([placeholder])[0]
+            vectorstore = self._new_vectorstore(ann_index.build_index("Flat", len(vector)))
+            vectorstore.add_embeddings([(placeholder, vector)], ids=[PLACEHOLDER_ID])
+        
+        self.last_update, self.last_indexed_id = last_update, last_indexed_id
+        vectorstore = self._save_snapshot(vectorstore)
+        
+        build_seconds = time.perf_counter() - started
+        self.index_build_seconds.observe(build_seconds, kind="full")
+        self.index_stats = self._describe_index(vectorstore)
+        self.index_stats["build_seconds"] = round(build_seconds, 3)
+        self.index_stats.update(probe.evaluate(vectorstore.index, vectorstore.index_to_docstore_id))
+        logger.info(f"Built vector store: {self.index_stats}")
+        return vectorstore
+    
+    def _new_vectorstore(self, index):
+        """Empty vector store around a (trained) FAISS index"""
+        ann_index.configure_search(index, self.faiss_nprobe, self.faiss_ef_search)
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=self._new_docstore(),
+            index_to_docstore_id=PositionMap()
+        )
+    
+    def _new_docstore(self):
+        """Empty docstore for a new index build.
+        
+        Each SQLite build writes a new generation file so the store being
+        replaced keeps serving queries until the swap.
+        """
+        if self.docstore_backend == "sqlite":
+            os.makedirs(self.vectorstore_dir, exist_ok=True)
+            return SQLiteDocstore(f"{self.vectorstore_path}.docstore-{uuid.uuid4().hex[:12]}.db")
+        return LayeredDocstore()
+    
+    def _remove_old_docstores(self, vectorstore):
+        """Delete SQLite docstore generations other than the one vectorstore uses"""
+        current = getattr(vectorstore.docstore, "path", None)
+        for path in glob.glob(f"{glob.escape(self.vectorstore_path)}.docstore-*.db"):
+            if current is None or not os.path.samefile(path, current):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not remove old docstore {path}: {e}")
+    
+    def _new_trained_vectorstore(self):
+        """Train an IVF index on a random sample of MongoDB documents.
+        
+        Returns None when the collection is too small to train on, in which
+        case a flat index is used instead.
+        """
+        num_docs = self.collection.estimated_document_count()
+        sample_size = min(self.faiss_training_sample, num_docs)
+        nlist = min(self.faiss_nlist or ann_index.default_nlist(num_docs),
+                    sample_size // ann_index.TRAINING_POINTS_PER_LIST)
+        min_sample = ann_index.PQ_MIN_TRAINING_POINTS if self.faiss_index_type == "ivf_pq" else 1
+        if nlist < 1 or sample_size < min_sample:
+            logger.info(f"Only {num_docs} documents, too few to train {self.faiss_index_type}; using a flat index")
+            return None
+        
+        sample = self.collection.aggregate([{"$sample": {"size": sample_size}}])
+        training_vectors = [vector for _, vectors in self._embed_in_batches(sample) for vector in vectors]
+        dimension = len(training_vectors[0])
+        factory = ann_index.factory_string(
+            self.faiss_index_type, self.faiss_vector_encoding, dimension,
+            nlist=nlist, pq_m=self.faiss_pq_m, hnsw_m=self.faiss_hnsw_m
+        )
+        return self._new_vectorstore(ann_index.build_index(factory, dimension, training_vectors))
+    
+    def _describe_index(self, vectorstore) -> Dict[str, Any]:
+        """Index type, size and on-disk bytes per vector"""
+        index = vectorstore.index
+        base = ann_index.base_index(index)
+        try:
+            size = os.path.getsize(f"{self.vectorstore_path}.faiss")
+        except OSError:
+            size = 0
+        return {
+            "index_class": type(faiss.downcast_index(base)).__name__,
+            "vectors": index.ntotal,
+            "bytes_per_vector": round(size / index.ntotal, 1) if index.ntotal else 0,
+            "memory_mapped": base is self._mapped_index,
+            "docstore": "sqlite" if isinstance(vectorstore.docstore, SQLiteDocstore) else "pickle"
+        }
+    
+    def _add_embedded_documents(self, vectorstore, docs: List[Dict[str, Any]], vectors: List[List[float]]):
+        """Upsert already-embedded documents, keyed by their _id, into vectorstore"""
+        ids = [str(doc["_id"]) for doc in docs]
+        texts = [self._convert_doc_to_text(doc) for doc in docs]
+        return self._add_embedded_texts(vectorstore, ids, texts, vectors)
+    
+    def _add_embedded_texts(self, vectorstore, ids: List[str], texts: List[str], vectors: List[List[float]]):
+        """Upsert already-embedded texts under the given ids into vectorstore"""
+        text_embeddings = list(zip(texts, vectors))
+        metadatas = [{"_id": doc_id} for doc_id in ids]
         
-        vectorstore = FAISS.from_texts(documents, self.embeddings)
-        self._save_vectorstore(vectorstore)
+        stale_ids = [doc_id for doc_id in ids + [PLACEHOLDER_ID] if docstore_contains(vectorstore.docstore, doc_id)]
+        if stale_ids:
+            self._remove_vectors(vectorstore, stale_ids)
+        vectorstore.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
         return vectorstore
     
-    def _save_vectorstore(self, vectorstore):
-        """Save FAISS vector store to disk"""
+    @staticmethod
+    def _remove_vectors(vectorstore, ids: List[str]):
+        """Remove documents from vectorstore.
+        
+        Only a plain flat index renumbers its vectors on removal the way
+        FAISS.delete expects. Otherwise positions are pointed at a tombstone
+        that retrieval skips: segmented flat indexes drop them when merged,
+        IVF and HNSW ones at the next full rebuild.
+        """
+        # The docstore can hold documents a failed update never indexed
+        mapping = vectorstore.index_to_docstore_id
+        ids = [doc_id for doc_id in ids if mapping.position(doc_id) is not None]
+        if not ids:
+            return
+        if isinstance(vectorstore.docstore, SQLiteDocstore):
+            vectorstore.docstore.mark_mapping_changed()
+        
+        if ann_index.supports_removal(vectorstore.index):
+            vectorstore.delete(ids)
+            vectorstore.index_to_docstore_id = PositionMap(vectorstore.index_to_docstore_id)
+            return
+        
+        for doc_id in ids:
+            mapping[mapping.position(doc_id)] = TOMBSTONE_ID
+        vectorstore.docstore.delete(ids)
+        if not docstore_contains(vectorstore.docstore, TOMBSTONE_ID):
+            vectorstore.docstore.add({TOMBSTONE_ID: Document(page_content="", metadata={"_id": TOMBSTONE_ID})})
+    
+    def _embed_in_batches(self, docs: Iterable[Dict[str, Any]]) -> Iterator[Tuple[List[Dict[str, Any]], List[List[float]]]]:
+        """Embed a stream of documents batch by batch, yielding (docs, vectors).
+        
+        Cached vectors are reused; the rest are computed in-process, or across
+        EMBEDDING_WORKERS processes once there is more than one batch to embed.
+        """
+        docs = iter(docs)
+        batches = iter(lambda: list(islice(docs, self.embedding_batch_size)), [])
+        first_batch = next(batches, None)
+        if first_batch is None:
+            return
+        second_batch = next(batches, None)
+        batches = chain([first_batch], [second_batch] if second_batch else [], batches)
+        
+        if second_batch is None or self.embedding_workers <= 1:
+            embedded = (
+                (batch, self.embeddings.embed_documents([self._convert_doc_to_text(doc) for doc in batch]))
+                for batch in batches
+            )
+        else:
+            embedded = self._embed_in_pool(batches)
+        
+        total = 0
+        started = batch_started = time.perf_counter()
+        for batch, vectors in embedded:
+            now = time.perf_counter()
+            total += len(batch)
+            self.documents_embedded_total.inc(len(batch))
+            logger.info(
+                f"Embedded batch of {len(batch)} documents "
+                f"({len(batch) / max(now - batch_started, 1e-9):.1f} docs/sec, "
+                f"{total} total at {total / max(now - started, 1e-9):.1f} docs/sec)"
+            )
+            batch_started = now
+            yield batch, vectors
+    
+    def _embed_in_pool(self, batches: Iterable[List[Dict[str, Any]]]):
+        """Embed batches across a process pool, yielding them in order as they complete"""
+        threads = max(1, (os.cpu_count() or 1) // self.embedding_workers)
+        # Workers are spawned, not forked: forking this process would copy its
+        # torch/OpenMP, pymongo and event loop threads' locks mid-use
+        with ProcessPoolExecutor(
+            max_workers=self.embedding_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=embedding_pool.init_worker,
+            initargs=(self._embeddings_factory(threads), threads)
+        ) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(self._submit_batch(pool, batch))
+                # Bound the number of batches held in memory
+                if len(pending) >= self.embedding_workers * 2:
+                    yield self._collect_batch(*pending.popleft())
+            
+            while pending:
+                yield self._collect_batch(*pending.popleft())
+    
+    @property
+    def embeddings_id(self) -> str:
+        """Identifies the vectors' origin; cache keys and saved indexes are tied to it"""
+        if self.embeddings_backend == "onnx":
+            return f"{self.embeddings_model}#onnx:{self.embeddings_onnx_file or default_model_file()}"
+        return self.embeddings_model
+    
+    def _embeddings_factory(self, num_threads: int = 0):
+        """Picklable constructor for the embedding model, also used in worker processes"""
+        if self.embeddings_backend == "onnx":
+            return partial(ONNXEmbeddings, model_name=self.embeddings_model,
+                           file_name=self.embeddings_onnx_file, num_threads=num_threads)
+        if self.embeddings_backend != "torch":
+            raise ValueError(f"Unknown EMBEDDINGS_BACKEND {self.embeddings_backend!r} (use torch or onnx)")
+        return partial(HuggingFaceEmbeddings, model_name=self.embeddings_model)
+    
+    def _submit_batch(self, pool, batch: List[Dict[str, Any]]):
+        """Look a batch up in the embedding cache and send the misses to the pool"""
+        texts = [self._convert_doc_to_text(doc) for doc in batch]
+        vectors = self.embeddings.lookup(texts)
+        missing = [text for text, vector in zip(texts, vectors) if vector is None]
+        future = pool.submit(embedding_pool.embed_batch, missing) if missing else None
+        return batch, texts, vectors, missing, future
+    
+    def _collect_batch(self, batch, texts, vectors, missing, future):
+        """Wait for a submitted batch and merge computed vectors with cached ones"""
+        if future is not None:
+            computed = future.result()
+            self.embeddings.store(missing, computed)
+            computed = dict(zip(missing, computed))
+            vectors = [computed[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return batch, vectors
+    
+    def _compact(self, vectorstore):
+        """Vector store with its index segments merged into one index, for saving.
+        
+        Tombstoned vectors are dropped where the merged index can remove
+        them, renumbering the positions after them. The in-memory docstore
+        and the mapping are flattened too, so the next writes copy only
+        their own changes again.
+        """
+        index = vectorstore.index
+        mapping = vectorstore.index_to_docstore_id
+        if isinstance(index, ann_index.SegmentedIndex):
+            index = index.merged(mapped=index.base is self._mapped_index)
+            ann_index.configure_search(index, self.faiss_nprobe, self.faiss_ef_search)
+            removed = [position for position, doc_id in mapping.items() if doc_id == TOMBSTONE_ID]
+            if removed and ann_index.supports_removal(index):
+                index.remove_ids(np.asarray(removed, dtype="int64"))
+                kept = [mapping[position] for position in range(len(mapping)) if mapping[position] != TOMBSTONE_ID]
+                mapping = dict(enumerate(kept))
+                if isinstance(vectorstore.docstore, SQLiteDocstore):
+                    vectorstore.docstore.mark_mapping_changed()
+        mapping = PositionMap(mapping)
+        docstore = vectorstore.docstore
+        if isinstance(docstore, LayeredDocstore):
+            docstore = docstore.flattened()
+        return FAISS(self.embeddings, index, docstore, mapping)
+    
+    def _save_snapshot(self, vectorstore, index_version: Optional[int] = None):
+        """Merge vectorstore's index segments and save it; returns the vector store to serve from.
+        
+        With FAISS_MMAP the saved index is mapped back in place of the merged
+        copy, so worker processes keep sharing one copy of it.
+        """
+        vectorstore = self._compact(vectorstore)
+        if not self._save_vectorstore(vectorstore, index_version) or not self.faiss_mmap:
+            return vectorstore
+        index = ann_index.read_index_mmap(f"{self.vectorstore_path}.faiss")
+        if index is None:
+            return vectorstore
+        ann_index.configure_search(index, self.faiss_nprobe, self.faiss_ef_search)
+        self._mapped_index = index
+        return FAISS(self.embeddings, index, vectorstore.docstore, vectorstore.index_to_docstore_id)
+    
+    def _save_vectorstore(self, vectorstore, index_version: Optional[int] = None) -> bool:
+        """Save a FAISS vector store snapshot and its watermark to disk.
+        
+        With the SQLite docstore, documents are already on disk; only the
+        index and the newly appended vector positions are written. The
+        snapshot contains every logged change, so the index log is cleared.
+        index_version is recorded when the snapshot is of an already
+        published version, letting other workers at that version keep
+        their in-memory index. Returns whether the snapshot was saved.
+        """
         try:
-            vectorstore.save_local(self.vectorstore_path)
+            started = time.perf_counter()
+            os.makedirs(self.vectorstore_dir, exist_ok=True)
+            temp_name = f"{self.vectorstore_name}_temp"
+            temp_path = os.path.join(self.vectorstore_dir, temp_name)
+            metadata = {
+                "id_scheme": INDEX_ID_SCHEME,
+                "embeddings": self.embeddings_id,
+                **self._watermark_fields(self.last_update, self.last_indexed_id),
+                "snapshot_id": uuid.uuid4().hex,
+                "index_version": index_version
+            }
+            
+            docstore = vectorstore.docstore
+            if isinstance(docstore, SQLiteDocstore):
+                faiss.write_index(vectorstore.index, f"{temp_path}.faiss")
+                docstore.save_mapping(vectorstore.index_to_docstore_id)
+                metadata["docstore_backend"] = "sqlite"
+                metadata["docstore_file"] = os.path.basename(docstore.path)
+                extensions = (".faiss", ".meta.json")
+            else:
+                vectorstore.save_local(self.vectorstore_dir, index_name=temp_name)
+                metadata["docstore_backend"] = "pickle"
+                extensions = (".faiss", ".pkl", ".meta.json")
+            
+            with open(f"{temp_path}.meta.json", "w") as f:
+                json.dump(metadata, f)
+            
+            # Atomically replace the previous files
+            for ext in extensions:
+                os.replace(f"{temp_path}{ext}", f"{self.vectorstore_path}{ext}")
+            self.index_log.truncate()
+            self._snapshot_id, self._log_offset = metadata["snapshot_id"], 0
+            self._record_stage("index_snapshot", time.perf_counter() - started)
             logger.info("Vector store saved successfully")
+            return True
         except Exception as e:
             logger.error(f"Failed to save vector store: {e}")
+            return False
     
-    def _fetch_all_documents(self) -> List[str]:
-        """Fetch all documents from MongoDB"""
-        try:
-            cursor = self.collection.find({})
-            documents = []
-            
-            for doc in cursor:
-                text_doc = self._convert_doc_to_text(doc)
-                documents.append(text_doc)
+    def _iter_documents(self, query: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream documents matching query (all by default) from MongoDB"""
+        return self.collection.find(query or {}, batch_size=self.embedding_batch_size)
+    
+    def _changed_documents_query(self) -> Dict[str, Any]:
+        """Mongo filter for documents changed since the indexed watermark"""
+        clauses = [{field: {"$gt": self.last_update}} for field in WATERMARK_FIELDS]
+        if self.last_indexed_id is not None:
+            clauses.append({"_id": {"$gt": self.last_indexed_id}})
+        return {"$or": clauses}
+    
+    @staticmethod
+    def _compute_watermark(docs: Iterable[Dict[str, Any]], last_update: datetime = datetime.min,
+                           last_indexed_id: Optional[ObjectId] = None):
+        """Advance (last_update, last_indexed_id) past the given documents"""
+        for doc in docs:
+            for field in WATERMARK_FIELDS:
+                timestamp = doc.get(field)
+                if isinstance(timestamp, datetime):
+                    timestamp = timestamp.replace(tzinfo=None)
+                    if timestamp > last_update:
+                        last_update = timestamp
             
-            logger.info(f"Fetched {len(documents)} documents from MongoDB")
-            return documents
+            doc_id = doc.get("_id")
+            if isinstance(doc_id, ObjectId) and (last_indexed_id is None or doc_id > last_indexed_id):
+                last_indexed_id = doc_id
+        
+        return last_update, last_indexed_id
+    
+    def _upsert_documents(self, vectorstore, lexical_index: BM25Index, docs: Iterable[Dict[str, Any]]) -> int:
+        """Replace the vectors of the given documents in an unpublished index copy, logging each batch.
         
+        The watermark moves past the documents, so the refresher does not
+        embed them again, unless other changes are still waiting for it:
+        it would skip those otherwise. Each log entry carries the watermark.
+        """
+        docs = list(docs)
+        last_update, last_indexed_id = self.last_update, self.last_indexed_id
+        advance = self._only_pending_changes(docs)
+        count = 0
+        for batch, vectors in self._embed_in_batches(docs):
+            ids = [str(doc["_id"]) for doc in batch]
+            texts = [self._convert_doc_to_text(doc) for doc in batch]
+            if advance:
+                last_update, last_indexed_id = self._compute_watermark(batch, last_update, last_indexed_id)
+            self._log_index_change({
+                "op": "upsert", "ids": ids, "texts": texts, "vectors": vectors,
+                **self._watermark_fields(last_update, last_indexed_id)
+            })
+            self._add_embedded_texts(vectorstore, ids, texts, vectors)
+            self._index_lexically(lexical_index, batch)
+            count += len(batch)
+        self.last_update, self.last_indexed_id = last_update, last_indexed_id
+        return count
+    
+    def _only_pending_changes(self, docs: List[Dict[str, Any]]) -> bool:
+        """Whether docs are the only MongoDB changes past the watermark"""
+        query = {"$and": [self._changed_documents_query(), {"_id": {"$nin": [doc["_id"] for doc in docs]}}]}
+        with self._timed("mongo_update_check"):
+            return self.collection.find_one(query, projection={"_id": 1}) is None
+    
+    def _log_index_change(self, entry: Dict[str, Any]):
+        """Append a change to the index log; the caller is caught up, so our replay position moves past it"""
+        self._log_offset = self.index_log.append(entry)
+    
+    def _replay_index_log(self, vectorstore, lexical_index: Optional[BM25Index] = None) -> int:
+        """Apply logged changes not yet in vectorstore (and lexical_index)"""
+        entries, self._log_offset = self.index_log.read(self._log_offset)
+        if entries and not isinstance(vectorstore.index, ann_index.SegmentedIndex):
+            # Changes go to a delta; the loaded (possibly memory-mapped) index stays shared
+            vectorstore.index = ann_index.SegmentedIndex(vectorstore.index)
+        for entry in entries:
+            if entry["op"] == "upsert":
+                self._add_embedded_texts(vectorstore, entry["ids"], entry["texts"], entry["vectors"])
+                if lexical_index is not None:
+                    lexical_index.add_many(zip(entry["ids"], entry["texts"]))
+                    lexical_index.remove(PLACEHOLDER_ID)
+                if "last_update" in entry:
+                    self._restore_watermark(entry)
+            elif entry["op"] == "delete":
+                self._remove_vectors(vectorstore, entry["ids"])
+                if lexical_index is not None:
+                    for doc_id in entry["ids"]:
+                        lexical_index.remove(doc_id)
+        return len(entries)
+    
+    def _persist_index(self):
+        """Snapshot the live index now if writes are not being coalesced, or the log or delta is large"""
+        index = self.vectorstore.index
+        delta = index.delta.ntotal if isinstance(index, ann_index.SegmentedIndex) else 0
+        if (self.index_snapshot_interval <= 0 or self.index_log.size() >= self.index_log_max_bytes
+                or delta >= self.index_delta_max_vectors):
+            self._snapshot_current()
+    
+    def _snapshot_current(self):
+        """Save the served index, then serve its merged form under the same version"""
+        snapshot = self._current
+        self._current = snapshot._replace(vectorstore=self._save_snapshot(snapshot.vectorstore, snapshot.version))
+    
+    def flush_index(self) -> bool:
+        """Snapshot the index if changes are pending in the index log"""
+        if not self.index_log.size():
+            return False
+        try:
+            with self._index_writer():
+                if not self.index_log.size():
+                    return False
+                self._snapshot_current()
+                return True
         except Exception as e:
-            logger.error(f"Error fetching documents: {e}")
-            return []
+            logger.error(f"Error snapshotting vector store: {e}")
+            return False
     
     def _convert_doc_to_text(self, doc: Dict[str, Any]) -> str:
         """Convert MongoDB document to searchable text"""
@@ -203,136 +1056,523 @@ class AlumniRAGService:
             """)
         ])
         
-        document_chain = create_stuff_documents_chain(
-            self.llm,
-            prompt,
-            document_variable_name="data"
-        )
-        
-        self.rag_chain = (
-            {"question": lambda x: x["input"], "data": lambda x: self.retriever.invoke(x["input"])}
-            | document_chain
-        )
+        self.prompt = prompt
+        self.rag_chain = RunnableLambda(self._build_prompt) | self.llm | StrOutputParser()
         
         self.conversational_chain = RunnableWithMessageHistory(
             self.rag_chain,
             self._get_session_history,
             input_messages_key="input",
-            history_messages_key="chat_history",
-            output_messages_key="answer"
+            history_messages_key="chat_history"
         )
     
+    def _build_prompt(self, inputs: Dict[str, Any]):
+        """Retrieve alumni documents for the question and fill in the prompt"""
+        question = inputs["input"]
+        with self._timed("retrieval"):
+            documents = self._retrieve(question)
+        with self._timed("prompt_assembly"):
+            data = "\n\n".join(document.page_content for document in documents)
+            prompt = self.prompt.invoke({"question": question, "data": data})
+        
+        trace = current_trace()
+        if trace is not None:
+            trace.note(
+                documents_used=len(documents),
+                document_ids=[document.metadata.get("_id") or document.id for document in documents],
+                prompt_chars=sum(len(message.content) for message in prompt.to_messages())
+            )
+        return prompt
+    
     def _get_session_history(self, session_id: str):
         """Get or create session history"""
-        if session_id not in self.conversation_store:
-            self.conversation_store[session_id] = InMemoryChatMessageHistory()
-        return self.conversation_store[session_id]
+        return self.conversation_store.history(session_id)
     
     def check_for_updates(self) -> bool:
-        """Check if vector store needs updating"""
-        # ... inside check_for_updates()
+        """Check if vector store needs updating; one indexed lookup, no writer lock or embedding"""
         try:
-            latest_doc = list(self.collection.find().sort([
-                ("updated_at", -1), ("created_at", -1), ("_id", -1)
-            ]).limit(1))
-
-            if not latest_doc:
-                return False
-
-            doc = latest_doc[0]
-            
-            # Try updated_at first, then created_at, then ObjectId generation_time
-            current_timestamp = doc.get("updated_at")
-            if not current_timestamp:
-                current_timestamp = doc.get("created_at")
-            if not current_timestamp and isinstance(doc["_id"], ObjectId):
-                current_timestamp = doc["_id"].generation_time
-            if not current_timestamp:
-                logger.warning("No valid timestamp found in latest document")
-                return False  # Can't determine update status
-
-            if current_timestamp > self.last_update:
-                self.last_update = current_timestamp
-                return True
-
-            return False
+            checked_at = time.time()
+            with self._timed("mongo_update_check"):
+                changed = self.collection.find_one(self._changed_documents_query(), projection={"_id": 1})
+            if changed is None:
+                self.index_fresh_as_of = max(self.index_fresh_as_of, checked_at)
+            return changed is not None
 
         except Exception as e:
             logger.error(f"Error checking for updates: {e}")
             return False
         
-    def update_vectorstore(self):
+    def update_vectorstore(self, full: bool = False):
+        """Bring the vector store up to date with MongoDB.
+        
+        Only documents created or updated since the indexed watermark are
+        re-embedded and upserted. Pass full=True to rebuild the whole index,
+        e.g. to drop vectors of documents deleted directly in MongoDB.
+        The new index is built aside and swapped in once it is ready.
+        """
         try:
-            logger.info("Updating vector store with latest data...")
-            documents = self._fetch_all_documents()
+            with self._index_writer():
+                checked_at = time.time()
+                if full:
+                    logger.info("Rebuilding vector store from all documents...")
+                    vectorstore = self._create_new_vectorstore()
+                    lexical_index = self._build_lexical_index(vectorstore)
+                    self.index_fresh_as_of = checked_at
+                    self._publish(vectorstore, lexical_index)
+                    self._remove_old_docstores(vectorstore)
+                    logger.info("Vector store rebuilt successfully")
+                    return True
 
-            if not documents:
-                logger.warning("No documents to index!")
-                return False
-
-            # Create new vectorstore safely
-            new_vectorstore = FAISS.from_texts(documents, self.embeddings)
-            temp_path = f"{self.vectorstore_path}_temp"
-
-            # Save to temp path first
-            new_vectorstore.save_local(temp_path)
+                logger.debug("Checking vector store for changed documents...")
+                started = time.perf_counter()
+                vectorstore = lexical_index = None
+                last_update, last_indexed_id = self.last_update, self.last_indexed_id
+                count = 0
+                for docs, vectors in self._embed_in_batches(self._iter_documents(self._changed_documents_query())):
+                    if vectorstore is None:
+                        vectorstore, lexical_index = self._begin_write()
+                    self._add_embedded_documents(vectorstore, docs, vectors)
+                    self._index_lexically(lexical_index, docs)
+                    last_update, last_indexed_id = self._compute_watermark(docs, last_update, last_indexed_id)
+                    count += len(docs)
 
-            # Atomically replace
-            if os.path.exists(f"{self.vectorstore_path}.faiss"):
-                os.rename(f"{self.vectorstore_path}.faiss", f"{self.vectorstore_path}.faiss.bak")
-            if os.path.exists(f"{self.vectorstore_path}.pkl"):
-                os.rename(f"{self.vectorstore_path}.pkl", f"{self.vectorstore_path}.pkl.bak")
+                if not count:
+                    self.index_fresh_as_of = checked_at
+                    logger.debug("Vector store is already up to date")
+                    return False
 
-            os.rename(f"{temp_path}.faiss", f"{self.vectorstore_path}.faiss")
-            os.rename(f"{temp_path}.pkl", f"{self.vectorstore_path}.pkl")
+                self.last_update, self.last_indexed_id = last_update, last_indexed_id
+                vectorstore = self._save_snapshot(vectorstore)
+                
+                # Swap in the updated index
+                self.index_fresh_as_of = checked_at
+                self._publish(vectorstore, lexical_index)
+                self.index_build_seconds.observe(time.perf_counter() - started, kind="incremental")
 
-            # Update in-memory
-            self.vectorstore = new_vectorstore
-            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 5})
-            self.last_update = datetime.now()  # Mark as updated
-
-            logger.info("Vector store updated successfully")
-            return True
+                logger.info(f"Vector store updated with {count} changed documents")
+                return True
 
         except Exception as e:
             logger.error(f"Error updating vector store: {e}")
             return False
+    
+    def _build_lexical_index(self, vectorstore) -> BM25Index:
+        """Build the BM25 index over the texts stored in vectorstore"""
+        lexical_index = BM25Index()
+        lexical_index.add_many(
+            (doc_id, document.page_content)
+            for doc_id, document in docstore_items(vectorstore.docstore)
+            if doc_id not in (PLACEHOLDER_ID, TOMBSTONE_ID)
+        )
+        return lexical_index
+    
+    def _index_lexically(self, lexical_index: BM25Index, docs: List[Dict[str, Any]]):
+        """Mirror upserted documents into an unpublished BM25 index copy"""
+        lexical_index.add_many((str(doc["_id"]), self._convert_doc_to_text(doc)) for doc in docs)
+        lexical_index.remove(PLACEHOLDER_ID)
+    
+    def _retrieve(self, question: str) -> List[Document]:
+        """Retrieve alumni documents for a question.
+        
+        Structured constraints (graduation year, company, department, skill,
+        location) are resolved through indexed Mongo queries first: small
+        result sets replace the vector search, larger ones restrict it.
+        Questions without constraints use hybrid retrieval.
+        """
+        snapshot = self._current
+        trace = current_trace()
+        matched_ids = self._resolve_structured_filter(question)
+        if not matched_ids:
+            if trace is not None:
+                trace.note(retrieval="hybrid", index_version=snapshot.version)
+            return self._hybrid_search(question, snapshot=snapshot)
+        
+        if trace is not None:
+            trace.note(
+                retrieval="structured" if len(matched_ids) <= self.structured_max_results else "structured+hybrid",
+                structured_matches=len(matched_ids),
+                index_version=snapshot.version
+            )
+        vectorstore = snapshot.vectorstore
+        if len(matched_ids) <= self.structured_max_results:
+            documents = [vectorstore.docstore.search(doc_id) for doc_id in matched_ids]
+            return [document for document in documents if isinstance(document, Document)]
+        
+        documents = self._hybrid_search(question, allowed_ids=set(matched_ids), snapshot=snapshot)
+        # Top up from the filtered set if the ranked candidates ran short
+        retrieved = {document.metadata.get("_id") for document in documents}
+        for doc_id in matched_ids:
+            if len(documents) >= self.retrieval_k:
+                break
+            document = vectorstore.docstore.search(doc_id)
+            if doc_id not in retrieved and isinstance(document, Document):
+                documents.append(document)
+        return documents
+    
+    def refresh_query_planner(self):
+        """Reload the planner's known field values if the index changed since they were read.
+        
+        Runs at startup and from the background refresher, not per request, so
+        values added by a write are matched from the next refresh on.
+        """
+        version = self.index_version
+        if self._planner_version != version:
+            self.query_planner.refresh()
+            self._planner_version = version
+    
+    def _resolve_structured_filter(self, question: str) -> List[str]:
+        """Ids of alumni matching the question's structured constraints, if any"""
+        query = self.query_planner.plan(question)
+        if query is None:
+            return []
+        
+        try:
+            with self._timed("mongo_structured_filter"):
+                cursor = self.collection.find(query, projection={"_id": 1}).limit(self.structured_scan_limit)
+                matched_ids = [str(doc["_id"]) for doc in cursor]
+            logger.info(f"Structured filter {query} matched {len(matched_ids)} alumni")
+            return matched_ids
+        except Exception as e:
+            logger.error(f"Error resolving structured filter: {e}")
+            return []
+    
+    def _hybrid_search(self, question: str, allowed_ids: Optional[set] = None,
+                       snapshot: Optional[IndexSnapshot] = None) -> List[Document]:
+        """Fuse FAISS and BM25 rankings by reciprocal rank, optionally within allowed_ids"""
+        snapshot = snapshot or self._current
+        vectorstore, lexical_index = snapshot.vectorstore, snapshot.lexical_index
+        
+        # Over-fetch when results will be filtered afterwards
+        candidates = self.retrieval_candidates * (5 if allowed_ids is not None else 1)
+        with self._timed("query_embedding"):
+            embedding = vectorstore.embedding_function.embed_query(question)
+        with self._timed("vector_search"):
+            dense = vectorstore.similarity_search_by_vector(embedding, k=candidates)
+        with self._timed("lexical_search"):
+            lexical = lexical_index.search(question, k=candidates)
+        
+        scores: Dict[str, float] = {}
+        documents: Dict[str, Document] = {}
+        for rank, document in enumerate(dense):
+            doc_id = document.metadata.get("_id") or document.id or document.page_content
+            if doc_id == TOMBSTONE_ID:
+                continue
+            if allowed_ids is not None and doc_id not in allowed_ids:
+                continue
+            documents[doc_id] = document
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1 / (RRF_K + rank + 1)
+        for rank, (doc_id, _) in enumerate(lexical):
+            if allowed_ids is not None and doc_id not in allowed_ids:
+                continue
+            if doc_id not in documents:
+                document = vectorstore.docstore.search(doc_id)
+                if not isinstance(document, Document):
+                    continue
+                documents[doc_id] = document
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1 / (RRF_K + rank + 1)
+        
+        ranked = sorted(scores, key=scores.get, reverse=True)[:self.retrieval_k]
+        return [documents[doc_id] for doc_id in ranked]
+    
+    def _clone_vectorstore(self, vectorstore):
+        """Copy a vector store so it can be modified while the original serves queries.
+        
+        Nothing of corpus size is copied: the index, the in-memory docstore
+        and the position mapping each share their base with the original
+        and copy only the changes since the last snapshot (the delta). A
+        SQLite docstore is shared outright: its deletes are soft, so the
+        original can still read every document its index refers to.
+        """
+        docstore = vectorstore.docstore
+        if isinstance(docstore, LayeredDocstore):
+            docstore = docstore.copy()
+        index = vectorstore.index
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index.copy() if isinstance(index, ann_index.SegmentedIndex) else ann_index.SegmentedIndex(index),
+            docstore=docstore,
+            index_to_docstore_id=vectorstore.index_to_docstore_id.copy()
+        )
+    
+    def _begin_write(self) -> Tuple[FAISS, BM25Index]:
+        """Private copies of the current index for a writer to modify and then publish"""
+        snapshot = self._current
+        return self._clone_vectorstore(snapshot.vectorstore), snapshot.lexical_index.copy()
+    
+    def _publish(self, vectorstore, lexical_index: BM25Index, version: Optional[int] = None):
+        """Make a new index version visible to readers with one reference swap.
+        
+        Unless version is given (already published elsewhere), the new
+        version is announced to other workers. Answers cached against older
+        versions are dropped.
+        """
+        if version is None:
+            version = self.shared_index.publish()
+        self._current = IndexSnapshot(
+            vectorstore=vectorstore,
+            lexical_index=lexical_index,
+            version=version
+        )
+        self.answer_cache.clear()
+    
+    @contextmanager
+    def _index_writer(self):
+        """Hold the index for writing across threads and worker processes.
+        
+        Changes published by other workers are loaded first, so this
+        worker's save never overwrites them.
+        """
+        with self._index_lock, self.shared_index.writer_lock():
+            self._reload_if_stale()
+            yield
+    
+    def sync_index(self) -> bool:
+        """Reload the index if another worker has published a newer version"""
+        if self.shared_index.current() <= self.index_version:
+            return False
+        try:
+            with self._index_lock, self.shared_index.writer_lock():
+                return self._reload_if_stale()
+        except Exception as e:
+            logger.error(f"Error reloading vector store: {e}")
+            return False
+    
+    def _reload_if_stale(self) -> bool:
+        """Catch up with the index published by other workers; caller holds the writer locks.
+        
+        If the snapshot on disk is the one we loaded, or a snapshot of the
+        version we already hold, only the index log is replayed. Otherwise
+        the snapshot is loaded aside, the log replayed onto it and swapped in.
+        """
+        version = self.shared_index.current()
+        if version <= self.index_version:
+            return False
+        
+        metadata = self._load_index_metadata()
+        snapshot_id = metadata.get("snapshot_id")
+        if snapshot_id == self._snapshot_id or metadata.get("index_version") == self.index_version:
+            if snapshot_id != self._snapshot_id:
+                self._snapshot_id, self._log_offset = snapshot_id, 0
+            vectorstore, lexical_index = self._begin_write()
+            replayed = self._replay_index_log(vectorstore, lexical_index)
+            logger.info(f"Applied {replayed} index changes up to version {version} from other workers")
+        else:
+            vectorstore = self._read_vectorstore(metadata)
+            ann_index.configure_search(vectorstore.index, self.faiss_nprobe, self.faiss_ef_search)
+            self._snapshot_id, self._log_offset = snapshot_id, 0
+            self._restore_watermark(metadata)
+            self._replay_index_log(vectorstore)
+            lexical_index = self._build_lexical_index(vectorstore)
+            self.index_fresh_as_of = max(self.index_fresh_as_of, os.path.getmtime(f"{self.vectorstore_path}.meta.json"))
+            logger.info(f"Reloaded vector store version {version} published by another worker")
+        
+        self.index_stats = self._describe_index(vectorstore)
+        self._publish(vectorstore, lexical_index, version)
+        return True
+    
+    def index_staleness(self) -> float:
+        """Seconds since the index was last known to match MongoDB"""
+        return time.time() - self.index_fresh_as_of
         
     def add_alumni_and_embed(self, alumni_data: Dict[str, Any]) -> str:
         try:
-            alumni_data['created_at'] = datetime.now()
-            result = self.collection.insert_one(alumni_data)
-            logger.info(f"Added alumni with ID: {result.inserted_id}")
+            with self._index_writer():
+                alumni_data['created_at'] = datetime.now()
+                result = self.collection.insert_one(alumni_data)
+                logger.info(f"Added alumni with ID: {result.inserted_id}")
 
-            text_doc = self._convert_doc_to_text(alumni_data)
-            self.vectorstore.add_texts([text_doc])
+                vectorstore, lexical_index = self._begin_write()
+                self._upsert_documents(vectorstore, lexical_index, [alumni_data])
+                self._publish(vectorstore, lexical_index)
 
-            # 🔥 CRITICAL: Rebuild retriever after adding texts!
-            self.retriever = self.vectorstore.as_retriever(search_kwargs={"k": 5})
-
-            self._save_vectorstore(self.vectorstore)
-            return str(result.inserted_id)
+                self._persist_index()
+                return str(result.inserted_id)
             
         except Exception as e:
             logger.error(f"Error adding alumni: {e}")
             raise
     
+    def add_alumni_bulk(self, alumni_docs: List[Dict[str, Any]]) -> Tuple[Dict[int, str], Dict[int, str], Optional[str]]:
+        """Insert many alumni with one insert_many, embed them in batches and save the index once.
+        
+        Returns ({position: alumni_id}, {position: error}, indexing error);
+        records MongoDB rejects are reported without aborting the rest. If
+        indexing fails once the records are stored, their ids are still
+        returned with the error: the next index refresh picks them up.
+        """
+        inserted, failed = {}, {}
+        if not alumni_docs:
+            return inserted, failed, None
+        
+        try:
+            with self._index_writer():
+                now = datetime.now()
+                for alumni_data in alumni_docs:
+                    alumni_data['created_at'] = now
+                try:
+                    self.collection.insert_many(alumni_docs, ordered=False)
+                except BulkWriteError as e:
+                    for error in e.details.get("writeErrors", []):
+                        failed[error["index"]] = error.get("errmsg", "Insert failed")
+                
+                for position, alumni_data in enumerate(alumni_docs):
+                    if position not in failed:
+                        inserted[position] = str(alumni_data['_id'])
+                logger.info(f"Bulk inserted {len(inserted)} alumni ({len(failed)} failed)")
+                
+                index_error = None
+                if inserted:
+                    try:
+                        vectorstore, lexical_index = self._begin_write()
+                        self._upsert_documents(vectorstore, lexical_index, [alumni_docs[position] for position in inserted])
+                        self._publish(vectorstore, lexical_index)
+                        self._persist_index()
+                    except Exception as e:
+                        logger.error(f"Bulk inserted alumni are not indexed yet: {e}")
+                        index_error = str(e)
+                return inserted, failed, index_error
+            
+        except Exception as e:
+            logger.error(f"Error bulk adding alumni: {e}")
+            raise
+    
+    def upsert_alumni(self, alumni_id: str, alumni_data: Dict[str, Any]) -> bool:
+        """Replace (or create) an alumni record and its vector in place.
+        
+        Returns True if an existing record was replaced.
+        """
+        try:
+            with self._index_writer():
+                doc_id = self._parse_alumni_id(alumni_id)
+                existing = self.collection.find_one({"_id": doc_id}, projection={"created_at": 1})
+            
+                now = datetime.now()
+                alumni_data['created_at'] = existing.get('created_at', now) if existing else now
+                alumni_data['updated_at'] = now
+                self.collection.replace_one({"_id": doc_id}, alumni_data, upsert=True)
+                alumni_data['_id'] = doc_id
+                logger.info(f"Upserted alumni with ID: {alumni_id}")
+
+                vectorstore, lexical_index = self._begin_write()
+                self._upsert_documents(vectorstore, lexical_index, [alumni_data])
+                self._publish(vectorstore, lexical_index)
+                self._persist_index()
+                return existing is not None
+            
+        except Exception as e:
+            logger.error(f"Error upserting alumni: {e}")
+            raise
+    
+    def delete_alumni(self, alumni_id: str) -> bool:
+        """Delete an alumni record and remove its vector from the index"""
+        try:
+            with self._index_writer():
+                doc_id = self._parse_alumni_id(alumni_id)
+                result = self.collection.delete_one({"_id": doc_id})
+            
+                removed_vector = docstore_contains(self.vectorstore.docstore, str(doc_id))
+                if removed_vector:
+                    vectorstore, lexical_index = self._begin_write()
+                    self._log_index_change({"op": "delete", "ids": [str(doc_id)]})
+                    self._remove_vectors(vectorstore, [str(doc_id)])
+                    lexical_index.remove(str(doc_id))
+                    self._publish(vectorstore, lexical_index)
+                    self._persist_index()
+            
+                if result.deleted_count or removed_vector:
+                    logger.info(f"Deleted alumni with ID: {alumni_id}")
+                    return True
+                return False
+            
+        except Exception as e:
+            logger.error(f"Error deleting alumni: {e}")
+            raise
+    
+    @staticmethod
+    def _parse_alumni_id(alumni_id: str):
+        """Convert an alumni id from the API into the Mongo _id value"""
+        return ObjectId(alumni_id) if ObjectId.is_valid(alumni_id) else alumni_id
+    
     def query_alumni(self, question: str, session_id: str = "default") -> Dict[str, Any]:
+        started, outcome = time.perf_counter(), "error"
         try:
-            if self.check_for_updates():
-                self.update_vectorstore()
+            index_version = self.index_version
+            answer = self._cached_answer(question, session_id, index_version)
+            outcome = "cached" if answer is not None else "answered"
+            if answer is None:
+                generate = partial(self._generate_answer, question, session_id, index_version)
+                key = self._coalescing_key(question, session_id, index_version)
+                if key is None:
+                    answer = generate()
+                else:
+                    answer, leader = self._flights.do(key, generate)
+                    if not leader:
+                        outcome = self._record_coalesced("sync", question, session_id, answer)
 
-            response = self.conversational_chain.invoke(
-                {
-                    "input": question,
-                    "chat_history": []  # ← This triggers the history system to record
-                },
-                config={"configurable": {"session_id": session_id}}
-            )
+            return {
+                "success": True,
+                "answer": answer,
+                "session_id": session_id
+            }
 
+        except Exception as e:
+            outcome = "error"
+            logger.error(f"Error processing query: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "answer": "Sorry, I encountered an error processing your question."
+            }
+        finally:
+            self._record_query("sync", outcome, started)
+    
+    def _generate_answer(self, question: str, session_id: str, index_version: int) -> str:
+        """Run retrieval and generation for question, recording it in the session's history"""
+        response = self.conversational_chain.invoke(
+            {
+                "input": question,
+                "chat_history": []  # ← This triggers the history system to record
+            },
+            config={"configurable": {"session_id": session_id}}
+        )
+        answer = str(response)
+        self.answer_cache.put(question, index_version, answer)
+        return answer
+    
+    async def aquery_alumni(self, question: str, session_id: str = "default") -> Dict[str, Any]:
+        """Async query_alumni that awaits the LLM instead of blocking the event loop.
+        
+        At most MAX_CONCURRENT_QUERIES generations run at once; the rest wait.
+        Requests that joined an identical in-flight generation do not take a slot.
+        Session store calls run in a worker thread, as the store may be on disk.
+        """
+        started = time.perf_counter()
+        index_version = self.index_version
+        answer = await asyncio.to_thread(self._cached_answer, question, session_id, index_version)
+        if answer is not None:
+            self._record_query("async", "cached", started)
             return {
                 "success": True,
-                "answer": str(response),
+                "answer": answer,
+                "session_id": session_id
+            }
+        
+        outcome = "error"
+        try:
+            generate = partial(self._agenerate_answer, question, session_id, index_version)
+            key = await asyncio.to_thread(self._coalescing_key, question, session_id, index_version)
+            if key is None:
+                answer = await generate()
+                outcome = "answered"
+            else:
+                answer, leader = await self._async_flights.do(key, generate)
+                outcome = "answered" if leader else await asyncio.to_thread(
+                    self._record_coalesced, "async", question, session_id, answer
+                )
+
+            return {
+                "success": True,
+                "answer": answer,
                 "session_id": session_id
             }
 
@@ -343,15 +1583,103 @@ class AlumniRAGService:
                 "error": str(e),
                 "answer": "Sorry, I encountered an error processing your question."
             }
+        finally:
+            self._record_query("async", outcome, started)
+    
+    async def _agenerate_answer(self, question: str, session_id: str, index_version: int) -> str:
+        """Async _generate_answer, within the MAX_CONCURRENT_QUERIES limit"""
+        async with self._query_slots:
+            self.queries_in_flight += 1
+            try:
+                response = await self.conversational_chain.ainvoke(
+                    {
+                        "input": question,
+                        "chat_history": []
+                    },
+                    config={"configurable": {"session_id": session_id}}
+                )
+                answer = str(response)
+                self.answer_cache.put(question, index_version, answer)
+                return answer
+            finally:
+                self.queries_in_flight -= 1
+                self.queries_completed += 1
+    
+    def _coalescing_key(self, question: str, session_id: str, index_version: int) -> Optional[Tuple[str, int]]:
+        """Key shared by requests that would build the same prompt; None if the session has history"""
+        if not self.coalesce_queries or session_id in self.conversation_store:
+            return None
+        return normalize_question(question), index_version
+    
+    def _record_coalesced(self, mode: str, question: str, session_id: str, answer: str) -> str:
+        """Record a shared answer in the joining request's own session; returns its outcome label"""
+        self._get_session_history(session_id).add_messages(
+            [HumanMessage(content=question), AIMessage(content=answer)]
+        )
+        self.coalesced_queries_total.inc(mode=mode)
+        trace = current_trace()
+        if trace is not None:
+            trace.note(coalesced=True)
+        return "coalesced"
+    
+    async def astream_alumni(self, question: str, session_id: str = "default") -> AsyncIterator[str]:
+        """Stream answer tokens as the LLM generates them.
+        
+        The full exchange is recorded in the session history once the
+        stream completes. Errors are raised to the caller.
+        """
+        started = time.perf_counter()
+        index_version = self.index_version
+        answer = await asyncio.to_thread(self._cached_answer, question, session_id, index_version)
+        if answer is not None:
+            self._record_query("stream", "cached", started)
+            yield answer
+            return
+        
+        outcome = "error"
+        async with self._query_slots:
+            self.queries_in_flight += 1
+            try:
+                tokens = []
+                async for chunk in self.conversational_chain.astream(
+                    {
+                        "input": question,
+                        "chat_history": []
+                    },
+                    config={"configurable": {"session_id": session_id}}
+                ):
+                    if chunk:
+                        tokens.append(str(chunk))
+                        yield tokens[-1]
+                self.answer_cache.put(question, index_version, "".join(tokens))
+                outcome = "answered"
+            finally:
+                self.queries_in_flight -= 1
+                self.queries_completed += 1
+                self._record_query("stream", outcome, started)
+    
+    def _record_query(self, mode: str, outcome: str, started: float):
+        """Count a handled question and observe its end-to-end latency"""
+        self.queries_total.inc(mode=mode, outcome=outcome)
+        self.query_seconds.observe(time.perf_counter() - started, mode=mode)
+    
+    def _cached_answer(self, question: str, session_id: str, index_version: int) -> Optional[str]:
+        """Return a cached answer, recording the exchange as the chain would"""
+        answer = self.answer_cache.get(question, index_version)
+        trace = current_trace()
+        if trace is not None:
+            trace.note(cached=answer is not None)
+        if answer is not None:
+            self._get_session_history(session_id).add_messages(
+                [HumanMessage(content=question), AIMessage(content=answer)]
+            )
+        return answer
+    
     def get_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
         try:
-            if session_id not in self.conversation_store:
-                return []
-            
-            history = self.conversation_store[session_id]
             messages = []
             
-            for message in history.messages:
+            for message in self.conversation_store.get_messages(session_id):
                 content = message.content
                 if not isinstance(content, str):
                     content = json.dumps(content, ensure_ascii=False)  # fallback
@@ -369,8 +1697,7 @@ class AlumniRAGService:
     def clear_conversation(self, session_id: str) -> bool:
         """Clear conversation history for a session"""
         try:
-            if session_id in self.conversation_store:
-                del self.conversation_store[session_id]
+            if self.conversation_store.clear(session_id):
                 logger.info(f"Cleared conversation for session: {session_id}")
                 return True
             return False
@@ -378,28 +1705,54 @@ class AlumniRAGService:
             logger.error(f"Error clearing conversation: {e}")
             return False
     
+    def _check_mongodb(self) -> Dict[str, Any]:
+        """Ping MongoDB; the document count comes from collection metadata, not a scan"""
+        self.client.admin.command('ping')
+        return {"estimated_documents": self.collection.estimated_document_count()}
+    
+    def _check_embeddings(self) -> Dict[str, Any]:
+        """One embedding forward pass; its vector is reused by the vector store check"""
+        vector = self.embeddings.embed_query("health check")
+        self._health_probe_vector = vector
+        return {"dimension": len(vector), "backend": self.embeddings_backend}
+    
+    def _check_vectorstore(self) -> Dict[str, Any]:
+        """Search the current index with the probe vector (no model call)"""
+        vector = self._health_probe_vector
+        if vector is None:
+            vector = self._health_probe_vector = self.embeddings.embed_query("health check")
+        snapshot = self._current
+        snapshot.vectorstore.similarity_search_by_vector(vector, k=1)
+        return {"vectors": snapshot.vectorstore.index.ntotal, "version": snapshot.version}
+    
+    def run_health_checks(self) -> Dict[str, Dict[str, Any]]:
+        """Refresh the cached component health results"""
+        return self.health.run()
+    
     def health_check(self) -> Dict[str, Any]:
-        """Check if all services are healthy"""
-        try:
-            # Test MongoDB
-            self.client.admin.command('ping')
-            mongo_status = "healthy"
-        except:
-            mongo_status = "unhealthy"
-        
-        try:
-            # Test vector store
-            test_results = self.retriever.invoke("test")
-            vectorstore_status = "healthy"
-        except:
-            vectorstore_status = "unhealthy"
+        """Service health from the last background component checks"""
+        components = self.health.results()
         
         return {
-            "mongodb": mongo_status,
-            "vectorstore": vectorstore_status,
-            "total_documents": self.collection.count_documents({}),
-            "active_sessions": len(self.conversation_store)
+            "mongodb": components["mongodb"]["status"],
+            "vectorstore": components["vectorstore"]["status"],
+            "total_documents": components["mongodb"]["details"].get("estimated_documents"),
+            "components": components,
+            "active_sessions": len(self.conversation_store),
+            "sessions": self.conversation_store.stats(),
+            "embedding_cache": self.embeddings.stats(),
+            "index_freshness": {
+                "staleness_seconds": round(self.index_staleness(), 3),
+                "max_staleness_seconds": self.max_index_staleness,
+                "within_bound": self.index_staleness() <= self.max_index_staleness,
+                "version": self.index_version,
+                "pending_log_bytes": self.index_log.size()
+            },
+            "index": self.index_stats,
+            "answer_cache": self.answer_cache.stats(),
+            "query_concurrency": {
+                "in_flight": self.queries_in_flight,
+                "max_concurrent": self.max_concurrent_queries,
+                "completed": self.queries_completed
+            }
         }
-
-# Global service instance
-rag_service = AlumniRAGService()
\ No newline at end of file
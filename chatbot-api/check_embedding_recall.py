@@ -0,0 +1,143 @@
+# check_embedding_recall.py
+"""
+Recall check of the ONNX embedding backend against the PyTorch one.
+
+Embeds the alumni documents and a set of questions (fixed ones plus ones
+about a single field of each document) with both backends and compares
+exact top-k retrieval:
+  recall@k        ONNX queries on an ONNX-built index vs PyTorch on PyTorch
+  mixed recall@k  ONNX queries on a PyTorch-built index vs PyTorch on PyTorch
+                  (serving while the index is rebuilt after a switch)
+It also reports the cosine similarity of paired vectors and each backend's
+embedding throughput. Exits non-zero if recall@k is below --min-recall.
+
+Reads documents from MongoDB like the service (MONGO_URI, DB_NAME,
+COLLECTION_NAME), or the bundled sample data with --sample. The model is
+EMBEDDINGS_MODEL and the ONNX file EMBEDDINGS_ONNX_FILE:
+    python check_embedding_recall.py [--sample] [--k 10] [--min-recall 0.9]
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from langchain_huggingface import HuggingFaceEmbeddings
+from chatbot import AlumniRAGService
+from onnx_embeddings import ONNXEmbeddings
+
+QUESTIONS = [
+    "Who works at Google?",
+    "Find machine learning experts",
+    "Which alumni are in Bangalore?",
+    "Who graduated in 2020?",
+    "Show me software engineers with cloud experience",
+    "Which alumni studied computer science?",
+    "Find data scientists who know Python",
+    "Who has more than 5 years of experience?",
+    "Alumni working in finance or banking",
+    "Who can mentor students interested in startups?",
+]
+
+# Questions about single fields of the documents, alongside QUESTIONS
+QUESTION_TEMPLATES = [
+    ("name", "Tell me about {}"),
+    ("company", "Who works at {}?"),
+    ("profession", "Find alumni working as {}"),
+    ("location", "Which alumni are in {}?"),
+    ("department", "Who studied {}?"),
+    ("graduation_year", "Who graduated in {}?"),
+    ("skills", "Find alumni who know {}"),
+]
+
+
+def load_documents(service: AlumniRAGService, sample: bool, limit: int) -> List[Dict[str, Any]]:
+    if sample:
+        from setup_sample_data import SAMPLE_ALUMNI_DATA
+        return list(SAMPLE_ALUMNI_DATA)
+    from pymongo import MongoClient
+    collection = MongoClient(service.mongo_uri)[service.db_name][service.collection_name]
+    return list(collection.find().limit(limit))
+
+
+def document_questions(docs: List[Dict[str, Any]], limit: int) -> List[str]:
+    """Up to limit distinct questions, each about one field of a document, cycling through the templates"""
+    questions: List[str] = []
+    for position, doc in enumerate(docs):
+        templates = [(field, template) for field, template in QUESTION_TEMPLATES if doc.get(field)]
+        if not templates:
+            continue
+        field, template = templates[position % len(templates)]
+        value = doc[field][0] if isinstance(doc[field], list) else doc[field]
+        question = template.format(value)
+        if question not in questions:
+            questions.append(question)
+            if len(questions) >= limit:
+                break
+    return questions
+
+
+def embed(embeddings, texts: List[str]) -> Tuple[np.ndarray, float]:
+    """Unit vectors (the index ranks them as FAISS does) and texts per second"""
+    started = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+    rate = len(texts) / max(time.perf_counter() - started, 1e-9)
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None), rate
+
+
+def top_k(queries: np.ndarray, docs: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-queries @ docs.T, axis=1)[:, :k]
+
+
+def recall(found: np.ndarray, expected: np.ndarray) -> float:
+    return float(np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, expected)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ONNX and PyTorch embedding retrieval")
+    parser.add_argument("--sample", action="store_true", help="Use the bundled sample alumni instead of MongoDB")
+    parser.add_argument("--limit", type=int, default=5000, help="Most documents read from MongoDB")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    args = parser.parse_args()
+
+    service = AlumniRAGService()  # Only for configuration and document text; connects to nothing
+    docs = load_documents(service, args.sample, args.limit)
+    if not docs:
+        print("❌ No documents to compare")
+        sys.exit(1)
+    documents = [service._convert_doc_to_text(doc) for doc in docs]
+    questions = QUESTIONS + document_questions(docs, 50)
+    k = min(args.k, len(documents))
+
+    print(f"🔢 {len(documents)} documents, {len(questions)} questions, {service.embeddings_model}")
+    torch_backend = HuggingFaceEmbeddings(model_name=service.embeddings_model)
+    onnx_backend = ONNXEmbeddings(service.embeddings_model, file_name=service.embeddings_onnx_file)
+    print(f"   ONNX file: {onnx_backend.file_name}")
+
+    torch_docs, torch_rate = embed(torch_backend, documents)
+    onnx_docs, onnx_rate = embed(onnx_backend, documents)
+    torch_queries, _ = embed(torch_backend, questions)
+    onnx_queries, _ = embed(onnx_backend, questions)
+
+    expected = top_k(torch_queries, torch_docs, k)
+    cosine = np.sum(torch_docs * onnx_docs, axis=1)
+    results = {
+        f"recall_at_{k}": recall(top_k(onnx_queries, onnx_docs, k), expected),
+        f"mixed_recall_at_{k}": recall(top_k(onnx_queries, torch_docs, k), expected),
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        "torch_docs_per_sec": torch_rate,
+        "onnx_docs_per_sec": onnx_rate,
+    }
+    for name, value in results.items():
+        print(f"📊 {name}: {value:.4f}")
+
+    if results[f"recall_at_{k}"] < args.min_recall:
+        print(f"❌ recall@{k} is below {args.min_recall}")
+        sys.exit(1)
+    print(f"✅ ONNX retrieval matches PyTorch (recall@{k} >= {args.min_recall})")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ from chatbot import AlumniRAGService
 class AlumniRAGDemo:
     def __init__(self):
         print("🤖 Initializing Alumni RAG System...")
-        self.rag_service = AlumniRAGService()
+        self.rag_service = AlumniRAGService().start()
         
     def run_demo_queries(self):
         """Run a series of demo queries to show system capabilities"""
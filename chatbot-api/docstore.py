@@ -0,0 +1,274 @@
+# docstore.py
+"""
+Document stores and the vector position -> document id mapping for the
+FAISS vector store.
+
+SQLiteDocstore replaces the pickled InMemoryDocstore: documents are looked
+up by id one row at a time, adding a document inserts a single row, and
+the position mapping is kept in its own table so that appends only write
+the new positions.
+
+LayeredDocstore (in memory) and PositionMap are copied for every index
+write: a copy shares the original's contents as a read-only base and keeps
+only its own changes, so a write costs the size of the changes since the
+last snapshot rather than of the corpus. Snapshots flatten them again.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """Docstore persisted in a SQLite file.
+
+    Deletes are soft: a deleted document disappears from membership checks
+    and iteration, but index snapshots that still reference it can read it
+    until the store is replaced by a full rebuild.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._saved_positions = 0
+        self._mapping_changed = True
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS vectors (
+                position INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        """Insert (or replace) documents, one row each"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (doc_id, content, metadata, deleted) VALUES (?, ?, ?, 0)",
+                [
+                    (doc_id, document.page_content, json.dumps(document.metadata, default=str))
+                    for doc_id, document in texts.items()
+                ]
+            )
+            self._conn.commit()
+
+    def delete(self, ids: List) -> None:
+        """Soft-delete documents"""
+        with self._lock:
+            self._conn.executemany("UPDATE documents SET deleted = 1 WHERE doc_id = ?", [(doc_id,) for doc_id in ids])
+            self._conn.commit()
+
+    def search(self, search: str) -> Union[str, Document]:
+        """Read a single document by id"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, metadata FROM documents WHERE doc_id = ?", (search,)
+            ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=row[0], metadata=json.loads(row[1]))
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM documents WHERE doc_id = ? AND deleted = 0", (doc_id,)
+            ).fetchone()
+        return row is not None
+
+    def items(self, page_size: int = 1000) -> Iterator[Tuple[str, Document]]:
+        """Stream all live documents, reading one page of rows at a time"""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, doc_id, content, metadata FROM documents "
+                    "WHERE rowid > ? AND deleted = 0 ORDER BY rowid LIMIT ?",
+                    (last_rowid, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, doc_id, content, metadata in rows:
+                yield doc_id, Document(id=doc_id, page_content=content, metadata=json.loads(metadata))
+            last_rowid = rows[-1][0]
+
+    def mark_mapping_changed(self):
+        """Existing positions moved (vectors were removed); next save rewrites them"""
+        self._mapping_changed = True
+
+    def save_mapping(self, index_to_docstore_id: Dict[int, str]):
+        """Persist the position -> id mapping, appending only new positions when possible"""
+        with self._lock:
+            if self._mapping_changed:
+                self._conn.execute("DELETE FROM vectors")
+                rows = index_to_docstore_id.items()
+            else:
+                rows = [
+                    (position, index_to_docstore_id[position])
+                    for position in range(self._saved_positions, len(index_to_docstore_id))
+                ]
+            self._conn.executemany("INSERT OR REPLACE INTO vectors (position, doc_id) VALUES (?, ?)", rows)
+            self._conn.commit()
+            self._saved_positions = len(index_to_docstore_id)
+            self._mapping_changed = False
+
+    def load_mapping(self, num_vectors: Optional[int] = None) -> Dict[int, str]:
+        """Position -> id mapping, truncated to the vectors present in the index"""
+        with self._lock:
+            rows = self._conn.execute("SELECT position, doc_id FROM vectors ORDER BY position").fetchall()
+        mapping = {position: doc_id for position, doc_id in rows if num_vectors is None or position < num_vectors}
+        self._saved_positions = len(mapping)
+        self._mapping_changed = False
+        return mapping
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LayeredDocstore(Docstore, AddableMixin):
+    """In-memory docstore whose copies share its documents and record only their own changes.
+
+    Pickles as a plain InMemoryDocstore, so saved stores load either way.
+    """
+
+    def __init__(self, documents: Optional[Dict[str, Document]] = None):
+        self._base: Dict[str, Document] = dict(documents or {})  # Shared with copies, never modified
+        self._added: Dict[str, Document] = {}
+        self._deleted: Set[str] = set()
+
+    def copy(self) -> "LayeredDocstore":
+        """Copy sharing this store's base; costs only the changes made on top of it"""
+        other = LayeredDocstore()
+        other._base, other._added, other._deleted = self._base, dict(self._added), set(self._deleted)
+        return other
+
+    def flattened(self) -> "LayeredDocstore":
+        """Copy with every document in its base"""
+        return LayeredDocstore(dict(self.items()))
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        overlapping = [doc_id for doc_id in texts if doc_id in self]
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        self._added.update(texts)
+        self._deleted.difference_update(texts)
+
+    def delete(self, ids: List) -> None:
+        missing = [doc_id for doc_id in ids if doc_id not in self]
+        if missing:
+            raise ValueError(f"Tried to delete ids that does not exist: {missing}")
+        for doc_id in ids:
+            self._added.pop(doc_id, None)
+            if doc_id in self._base:
+                self._deleted.add(doc_id)
+
+    def search(self, search: str) -> Union[str, Document]:
+        if search in self._added:
+            return self._added[search]
+        if search in self:
+            return self._base[search]
+        return f"ID {search} not found."
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._added or (doc_id in self._base and doc_id not in self._deleted)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+    def items(self) -> Iterator[Tuple[str, Document]]:
+        for doc_id, document in self._base.items():
+            if doc_id not in self._deleted and doc_id not in self._added:
+                yield doc_id, document
+        yield from self._added.items()
+
+    def __reduce__(self):
+        return InMemoryDocstore, (dict(self.items()),)
+
+
+class PositionMap(MutableMapping):
+    """Vector position -> document id mapping that also finds the position of an id.
+
+    Copies share the original's entries as a read-only base and record only
+    their own changes. Positions are appended or re-pointed (at a
+    tombstone), never deleted. Pickles as a plain dict.
+    """
+
+    def __init__(self, mapping: Optional[Dict[int, str]] = None):
+        # Shared with copies, never modified
+        self._base: Dict[int, str] = dict(mapping or {})
+        self._base_positions: Dict[str, int] = {doc_id: position for position, doc_id in self._base.items()}
+        self._changes: Dict[int, str] = {}
+        self._changed_positions: Dict[str, Optional[int]] = {}
+        self._size = len(self._base)
+
+    def copy(self) -> "PositionMap":
+        """Copy sharing this map's base; costs only the changes made on top of it"""
+        other = PositionMap()
+        other._base, other._base_positions, other._size = self._base, self._base_positions, self._size
+        other._changes, other._changed_positions = dict(self._changes), dict(self._changed_positions)
+        return other
+
+    def position(self, doc_id: str) -> Optional[int]:
+        """Position of doc_id's vector, or None if it has none"""
+        if doc_id in self._changed_positions:
+            return self._changed_positions[doc_id]
+        return self._base_positions.get(doc_id)
+
+    def __getitem__(self, position: int) -> str:
+        if position in self._changes:
+            return self._changes[position]
+        return self._base[position]
+
+    def __setitem__(self, position: int, doc_id: str):
+        previous = self.get(position)
+        if previous is None:
+            self._size += 1
+        elif self.position(previous) == position:
+            self._changed_positions[previous] = None
+        self._changes[position] = doc_id
+        self._changed_positions[doc_id] = position
+
+    def __delitem__(self, position: int):
+        raise TypeError("Vector positions are re-pointed at a tombstone, not deleted")
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self._base
+        yield from (position for position in self._changes if position not in self._base)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __reduce__(self):
+        return dict, (dict(self.items()),)
+
+
+def docstore_contains(docstore, doc_id: str) -> bool:
+    """Whether a live document with doc_id is in docstore"""
+    if isinstance(docstore, (SQLiteDocstore, LayeredDocstore)):
+        return doc_id in docstore
+    return doc_id in docstore._dict
+
+
+def docstore_items(docstore) -> Iterator[Tuple[str, Document]]:
+    """(id, document) pairs of every live document in docstore"""
+    if isinstance(docstore, (SQLiteDocstore, LayeredDocstore)):
+        return docstore.items()
+    return iter(docstore._dict.items())
@@ -0,0 +1,139 @@
+# embedding_cache.py
+"""
+Persistent, content-addressed cache for document embeddings.
+
+Vectors are stored in SQLite keyed by a hash of (embedding model name,
+document text), so rebuilding the index only embeds text that changed.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that caches document vectors on disk with LRU eviction"""
+
+    def __init__(self, underlying: Embeddings, model_name: str, path: str, max_entries: int = 100000):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        """Content address of a text for the current model"""
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, computing vectors only for uncached texts"""
+        vectors = self.lookup(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            # Identical texts in one batch are embedded once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            computed = dict(zip(unique_texts, self.underlying.embed_documents(unique_texts)))
+            self.store(unique_texts, [computed[text] for text in unique_texts])
+            for i in missing:
+                vectors[i] = computed[texts[i]]
+        return vectors
+
+    def lookup(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Cached vector for each text, or None where it must be computed"""
+        keys = [self._key(text) for text in texts]
+        found = self._lookup(set(keys))
+        vectors = [found.get(key) for key in keys]
+
+        with self._lock:
+            misses = sum(1 for vector in vectors if vector is None)
+            self.hits += len(texts) - misses
+            self.misses += misses
+        return vectors
+
+    def store(self, texts: List[str], vectors: List[List[float]]):
+        """Add freshly computed vectors to the cache"""
+        self._store({self._key(text): vector for text, vector in zip(texts, vectors)})
+
+    def embed_query(self, text: str) -> List[float]:
+        """Queries are one-off, so they bypass the cache"""
+        return self.underlying.embed_query(text)
+
+    def _lookup(self, keys) -> Dict[str, List[float]]:
+        """Fetch cached vectors for keys and mark them as recently used"""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        """Persist new vectors and evict the least recently used overflow"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in vectors.items()]
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                logger.info(f"Evicted {count - self.max_entries} embeddings from cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since startup and current cache size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": entries,
+                "max_entries": self.max_entries
+            }
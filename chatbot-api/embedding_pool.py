@@ -0,0 +1,29 @@
+# embedding_pool.py
+"""
+Worker-process helpers for embedding large document sets in parallel.
+
+Kept out of chatbot.py so that worker processes, which are spawned
+rather than forked, never import (and thus never construct) the RAG
+service singleton.
+"""
+
+_worker_embeddings = None
+
+
+def init_worker(embeddings_factory, num_threads: int):
+    """Build one embedding model per worker process"""
+    global _worker_embeddings
+
+    # Keep workers x intra-op threads within the available cores
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    _worker_embeddings = embeddings_factory()
+
+
+def embed_batch(texts):
+    """Embed one batch of texts in the worker process"""
+    return _worker_embeddings.embed_documents(texts)
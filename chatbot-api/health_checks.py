@@ -0,0 +1,65 @@
+# health_checks.py
+"""
+Cached component health checks.
+
+Checks run in the background every HEALTH_CHECK_INTERVAL seconds; health
+endpoints only read the last results, so probes never pay for a Mongo
+round trip or an embedding forward pass.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Runs registered component checks and keeps each one's last result.
+
+    A check is a callable that raises if the component is unhealthy and may
+    return a dict of details (e.g. a document count) to report with it.
+    """
+
+    def __init__(self, interval: float = 15, max_age: Optional[float] = None):
+        self.interval = interval
+        # Results older than this (a hung or stopped checker) count as unhealthy
+        self.max_age = max_age if max_age is not None else 3 * interval
+        self._checks: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, check: Callable[[], Optional[Dict[str, Any]]]):
+        self._checks[name] = check
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """Run every check once, timing each, and store the results"""
+        for name, check in self._checks.items():
+            started = time.perf_counter()
+            try:
+                details = check() or {}
+                result = {"status": "healthy", "error": None, "details": details}
+            except Exception as e:
+                logger.warning(f"Health check {name} failed: {e}")
+                result = {"status": "unhealthy", "error": str(e), "details": {}}
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            result["checked_at"] = time.time()
+            with self._lock:
+                self._results[name] = result
+        return self.results()
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """Last result of every component; never-run or outdated checks are not healthy"""
+        now = time.time()
+        results = {}
+        with self._lock:
+            for name in self._checks:
+                result = self._results.get(name)
+                if result is None:
+                    result = {"status": "unknown", "error": "not checked yet", "details": {},
+                              "latency_ms": None, "checked_at": None}
+                elif now - result["checked_at"] > self.max_age:
+                    result = dict(result, status="stale", error=f"last checked {now - result['checked_at']:.0f}s ago")
+                results[name] = dict(result)
+        return results
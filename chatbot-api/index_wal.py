@@ -0,0 +1,84 @@
+# index_wal.py
+"""
+Write-ahead log of vector store changes made since the last snapshot.
+
+API writes append their embedded documents (or deleted ids) here instead
+of rewriting the whole index on disk; a periodic flush snapshots the index
+and truncates the log. On startup, and when another worker has written,
+the snapshot is loaded and the log replayed on top of it.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IndexWAL:
+    """Append-only JSON-lines log; callers serialize writers"""
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Durably append one entry; returns the log size after it"""
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a+b") as f:
+                # Terminate a line torn by a crash so this entry stays readable
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                return f.tell()
+
+    def read(self, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Entries from byte offset on, and the offset after the last complete one.
+
+        A torn final line (crash mid-append) is ignored.
+        """
+        with self._lock:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return [], 0
+
+        entries = []
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping unreadable index log entry at byte {offset}")
+            offset += len(line)
+        return entries, offset
+
+    def size(self) -> int:
+        """Bytes pending in the log"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def truncate(self):
+        """Drop all entries once they are contained in a snapshot"""
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,182 @@
+# lexical_index.py
+"""
+In-process BM25 inverted index over alumni document text.
+
+Complements dense FAISS retrieval for exact-token lookups (company names,
+emails, rare skills) that embeddings tend to blur.
+
+Indexes are copy-on-write: writers modify a copy() and publish it, so a
+published index is never modified and is searched without locking. A
+copy shares everything but the changes made since the last compaction,
+so it costs the same however many documents are indexed.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+|\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; email addresses are kept whole"""
+    return [token.rstrip(".") for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+class BM25Index:
+    """Okapi BM25 index supporting incremental add and remove and cheap copies.
+
+    Documents are held in two layers: a base that is never modified once
+    built, and the changes since (documents added, base documents
+    removed). Copies share the base and copy only the changes, which are
+    folded into a new base once there are more than max_changes of them.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, max_changes: int = 1000):
+        self.k1 = k1
+        self.b = b
+        self.max_changes = max_changes
+        # Base layer, possibly shared with other copies
+        self._base_postings: Dict[str, Dict[str, int]] = {}
+        self._base_terms: Dict[str, Counter] = {}
+        self._base_lengths: Dict[str, int] = {}
+        # Documents added since the base was built, and base documents removed since
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._removed: Set[str] = set()
+        self._num_docs = 0
+        self._total_length = 0
+        # Terms whose added postings this index may modify (not shared with another copy)
+        self._owned_terms: Optional[Set[str]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._num_docs
+
+    def copy(self) -> "BM25Index":
+        """Independent index sharing the base and unmodified postings with this one"""
+        with self._lock:
+            clone = BM25Index(self.k1, self.b, self.max_changes)
+            clone._base_postings = self._base_postings
+            clone._base_terms = self._base_terms
+            clone._base_lengths = self._base_lengths
+            clone._postings = dict(self._postings)
+            clone._doc_terms = dict(self._doc_terms)
+            clone._doc_lengths = dict(self._doc_lengths)
+            clone._removed = set(self._removed)
+            clone._num_docs = self._num_docs
+            clone._total_length = self._total_length
+            clone._owned_terms = set()
+            # Postings are now shared, so this index must copy before writing too
+            self._owned_terms = set()
+            return clone
+
+    def _writable_postings(self, term: str) -> Dict[str, int]:
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+        elif self._owned_terms is not None and term not in self._owned_terms:
+            postings = self._postings[term] = dict(postings)
+        if self._owned_terms is not None:
+            self._owned_terms.add(term)
+        return postings
+
+    def add(self, doc_id: str, text: str):
+        """Index text under doc_id, replacing any previous version"""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            self._doc_terms[doc_id] = terms
+            self._doc_lengths[doc_id] = sum(terms.values())
+            self._num_docs += 1
+            self._total_length += self._doc_lengths[doc_id]
+            for term, frequency in terms.items():
+                self._writable_postings(term)[doc_id] = frequency
+            # An index still being built is never copied, so folding can wait for its first writer
+            if self._owned_terms is not None and len(self._doc_terms) + len(self._removed) > self.max_changes:
+                self._compact()
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]):
+        """Index (doc_id, text) pairs"""
+        for doc_id, text in documents:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str):
+        """Drop doc_id from the index if present"""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is not None:
+            # Any base version of an added document is already removed
+            self._num_docs -= 1
+            self._total_length -= self._doc_lengths.pop(doc_id)
+            for term in terms:
+                postings = self._writable_postings(term)
+                del postings[doc_id]
+                if not postings:
+                    del self._postings[term]
+        elif doc_id in self._base_lengths and doc_id not in self._removed:
+            self._removed.add(doc_id)
+            self._num_docs -= 1
+            self._total_length -= self._base_lengths[doc_id]
+
+    def _compact(self):
+        """Fold the changes into a new base; the old base is left as is for copies sharing it"""
+        affected = set(self._postings)
+        for doc_id in self._removed:
+            affected.update(self._base_terms[doc_id])
+        postings = dict(self._base_postings)
+        for term in affected:
+            merged = {
+                doc_id: frequency for doc_id, frequency in postings.get(term, {}).items()
+                if doc_id not in self._removed
+            }
+            merged.update(self._postings.get(term, {}))
+            if merged:
+                postings[term] = merged
+            else:
+                postings.pop(term, None)
+
+        terms, lengths = dict(self._base_terms), dict(self._base_lengths)
+        for doc_id in self._removed:
+            del terms[doc_id], lengths[doc_id]
+        terms.update(self._doc_terms)
+        lengths.update(self._doc_lengths)
+
+        self._base_postings, self._base_terms, self._base_lengths = postings, terms, lengths
+        self._postings, self._doc_terms, self._doc_lengths = {}, {}, {}
+        self._removed = set()
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) pairs for query, best first.
+
+        Takes no lock: only call it on an index nobody is modifying.
+        """
+        num_docs = self._num_docs
+        if not num_docs:
+            return []
+        avg_length = self._total_length / num_docs
+        removed = self._removed
+
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            base_postings = self._base_postings.get(term, {})
+            postings = self._postings.get(term, {})
+            matches = len(base_postings) - sum(1 for doc_id in removed if doc_id in base_postings) + len(postings)
+            if not matches:
+                continue
+            idf = math.log(1 + (num_docs - matches + 0.5) / (matches + 0.5))
+            for layer, lengths, skipped in ((base_postings, self._base_lengths, removed),
+                                            (postings, self._doc_lengths, ())):
+                for doc_id, frequency in layer.items():
+                    if doc_id in skipped:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
@@ -1,20 +1,54 @@
 # main.py
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import Dict, Any, List, Optional
 import uvicorn
 import logging
-from contextlib import asynccontextmanager
+import asyncio
+import os
+import json
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from contextlib import asynccontextmanager, suppress
 
 # Import our RAG service
 from chatbot import AlumniRAGService
+from request_trace import tracing
+from profiling import capture_profile
+
+# Cheap: nothing connects or loads until the lifespan hook starts the service
 rag_service = AlumniRAGService()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bounded pool for blocking service calls (Mongo writes, embedding, index saves)
+blocking_executor = ThreadPoolExecutor(max_workers=int(os.getenv('API_BLOCKING_WORKERS', '4')))
+
+# Largest number of records accepted by POST /alumni/bulk
+BULK_MAX_RECORDS = int(os.getenv('ALUMNI_BULK_MAX_RECORDS', '10000'))
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', '60'))
+_profile_lock = asyncio.Lock()
+
+# Startup is retried this often (seconds) while MongoDB or a model is unavailable
+STARTUP_RETRY_INTERVAL = float(os.getenv('STARTUP_RETRY_INTERVAL', '5'))
+# Served while the service is starting; every other path gets 503 until it is ready
+STARTUP_EXEMPT_PATHS = {"/", "/health/live", "/health/ready", "/metrics", "/admin/profile"}
+service_ready = asyncio.Event()
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking service call without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_executor, partial(func, *args, **kwargs))
+
 # Pydantic models for request/response
 class QueryRequest(BaseModel):
     question: str = Field(..., min_length=1, max_length=500, description="Question about alumni")
@@ -25,6 +59,7 @@ class QueryResponse(BaseModel):
     answer: str
     session_id: str
     error: Optional[str] = None
+    timing: Optional[Dict[str, Any]] = None  # Stage breakdown, only when requested
 
 class AddAlumniRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -46,6 +81,21 @@ class AddAlumniResponse(BaseModel):
     message: str
     error: Optional[str] = None
 
+class BulkAlumniFailure(BaseModel):
+    index: int
+    error: str
+
+class BulkAddAlumniResponse(BaseModel):
+    success: bool
+    inserted: int
+    failed: int
+    alumni_ids: Dict[int, str]
+    failures: List[BulkAlumniFailure]
+    # Stored in MongoDB but not yet searchable; the background refresh indexes them
+    indexing_pending: bool = False
+    message: str
+    error: Optional[str] = None
+
 class ConversationMessage(BaseModel):
     type: str  # "human" or "ai"
     content: str
@@ -55,38 +105,191 @@ class ConversationHistoryResponse(BaseModel):
     session_id: str
     messages: List[ConversationMessage]
 
+class ComponentHealth(BaseModel):
+    status: str  # "healthy", "unhealthy", "stale" or "unknown"
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    error: Optional[str] = None
+    details: Dict[str, Any] = {}
+
+class LivenessResponse(BaseModel):
+    status: str
+
+class ReadinessResponse(BaseModel):
+    status: str
+    startup: Dict[str, Any]
+    components: Dict[str, ComponentHealth]
+
 class HealthCheckResponse(BaseModel):
     status: str
     mongodb: str
     vectorstore: str
-    total_documents: int
+    total_documents: Optional[int] = None
+    components: Dict[str, ComponentHealth]
     active_sessions: int
+    sessions: Dict[str, Any]
+    embedding_cache: Dict[str, Any]
+    index_freshness: Dict[str, Any]
+    index: Dict[str, Any]
+    answer_cache: Dict[str, Any]
+    query_concurrency: Dict[str, Any]
+
+def _timing_requested(request: Request) -> bool:
+    """Whether the client asked for a stage timing breakdown (X-Debug-Timing header or ?debug=true)"""
+    flag = request.headers.get("x-debug-timing") or request.query_params.get("debug") or ""
+    return flag.lower() in ("1", "true", "yes")
+
+def _require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def _alumni_request_to_document(request: AddAlumniRequest) -> Dict[str, Any]:
+    """Convert an alumni request into the MongoDB document to store"""
+    # Convert request to dict, excluding None values
+    alumni_data = request.model_dump(exclude_none=True)
+    
+    # If additional_info is provided, merge it into the main document
+    if alumni_data.get('additional_info'):
+        additional_info = alumni_data.pop('additional_info')
+        alumni_data.update(additional_info)
+    
+    return alumni_data
+
+async def _read_bulk_records(request: Request) -> List[Any]:
+    """Raw records from a JSON array body or an NDJSON stream (one record per line)"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in NDJSON_CONTENT_TYPES:
+        try:
+            records = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of alumni records")
+        if len(records) > BULK_MAX_RECORDS:
+            raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_RECORDS} records per request")
+        return records
+    
+    # NDJSON lines are parsed per record, so one bad line only fails itself
+    records, buffer = [], b""
+    async for chunk in request.stream():
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        records.extend(line for line in lines if line.strip())
+        if len(records) > BULK_MAX_RECORDS:
+            raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_RECORDS} records per request")
+    if buffer.strip():
+        records.append(buffer)
+    if len(records) > BULK_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_RECORDS} records per request")
+    return records
 
 # Lifespan context manager for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Alumni RAG API...")
-    try:
-        # The service is already initialized when imported
-        health = rag_service.health_check()
-        logger.info(f"Service health check: {health}")
-        logger.info("Alumni RAG API started successfully")
-    except Exception as e:
-        logger.error(f"Failed to start service: {e}")
-        raise
+    # Initialization and warm-up run in the background so the port is bound
+    # at once; /health/ready answers 503 until they are done
+    starter = asyncio.create_task(_start_service())
+    
+    # Keep the index fresh in the background so /query never waits on indexing
+    refresher = asyncio.create_task(_refresh_index_periodically())
+    # Pick up index changes made through other worker processes
+    syncer = asyncio.create_task(_sync_index_periodically())
+    # Snapshot logged index writes in the background instead of on every write
+    flusher = asyncio.create_task(_flush_index_periodically())
+    # Health endpoints serve these cached results instead of probing per request
+    checker = asyncio.create_task(_check_health_periodically())
     
     yield
     
     # Shutdown
     logger.info("Shutting down Alumni RAG API...")
+    for task in (starter, refresher, syncer, flusher, checker):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    if rag_service.components_initialized:
+        await asyncio.to_thread(rag_service.flush_index)
+    blocking_executor.shutdown(wait=False)
+
+async def _start_service():
+    """Initialize and warm up the service, retrying until MongoDB and the models are reachable"""
+    while True:
+        try:
+            await asyncio.to_thread(rag_service.warm_up)
+            components = await asyncio.to_thread(rag_service.run_health_checks)
+            logger.info(f"Service health check: {components}")
+            break
+        except Exception as e:
+            logger.error(f"Failed to start service, retrying in {STARTUP_RETRY_INTERVAL:g}s: {e}")
+            await asyncio.sleep(STARTUP_RETRY_INTERVAL)
+    service_ready.set()
+    logger.info(f"Alumni RAG API ready in {rag_service.startup['time_to_ready_seconds']}s")
+
+async def _refresh_index_periodically():
+    """Apply MongoDB changes to the vector store and query planner every INDEX_REFRESH_INTERVAL seconds"""
+    await service_ready.wait()
+    while True:
+        await asyncio.sleep(rag_service.index_refresh_interval)
+        try:
+            # Most ticks find nothing; those skip the writer lock and the batched scan
+            if await asyncio.to_thread(rag_service.check_for_updates):
+                await asyncio.to_thread(rag_service.update_vectorstore)
+            # Also picks up versions published by API writes and other workers
+            await asyncio.to_thread(rag_service.refresh_query_planner)
+        except Exception as e:
+            logger.error(f"Background index refresh failed: {e}")
+
+async def _sync_index_periodically():
+    """Reload the index every INDEX_SYNC_INTERVAL seconds if another worker changed it"""
+    await service_ready.wait()
+    while True:
+        await asyncio.sleep(rag_service.index_sync_interval)
+        try:
+            await asyncio.to_thread(rag_service.sync_index)
+        except Exception as e:
+            logger.error(f"Background index sync failed: {e}")
+
+async def _flush_index_periodically():
+    """Snapshot the index every INDEX_SNAPSHOT_INTERVAL seconds if writes are pending"""
+    if rag_service.index_snapshot_interval <= 0:
+        return  # Every write is snapshotted immediately
+    await service_ready.wait()
+    while True:
+        await asyncio.sleep(rag_service.index_snapshot_interval)
+        try:
+            await asyncio.to_thread(rag_service.flush_index)
+        except Exception as e:
+            logger.error(f"Background index snapshot failed: {e}")
+
+async def _check_health_periodically():
+    """Re-run component health checks every HEALTH_CHECK_INTERVAL seconds"""
+    await service_ready.wait()
+    while True:
+        await asyncio.sleep(rag_service.health.interval)
+        try:
+            await asyncio.to_thread(rag_service.run_health_checks)
+        except Exception as e:
+            logger.error(f"Background health check failed: {e}")
+
+async def require_ready(request: Request):
+    """Route dependency: 503 with Retry-After for requests that need the service before it is ready"""
+    if not rag_service.ready and request.url.path not in STARTUP_EXEMPT_PATHS:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service is starting ({rag_service.startup['state']})",
+            headers={"Retry-After": str(max(1, int(STARTUP_RETRY_INTERVAL)))}
+        )
 
 # Create FastAPI app
 app = FastAPI(
     title="Alumni RAG API",
     description="AI-powered question answering system for Alumni Management",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    dependencies=[Depends(require_ready)]
 )
 
 # Add CORS middleware
@@ -99,32 +302,77 @@ app.add_middleware(
 )
 
 @app.post("/query", response_model=QueryResponse)
-async def query_alumni(request: QueryRequest):
+async def query_alumni(request: QueryRequest, http_request: Request):
     """
     Query the alumni database using natural language
     
     - **question**: Natural language question about alumni
     - **session_id**: Optional session ID to maintain conversation context
+    
+    Send `X-Debug-Timing: 1` (or `?debug=true`) to get a stage-by-stage
+    timing breakdown in the `timing` field.
     """
     try:
         logger.info(f"Processing query: {request.question[:50]}...")
         
-        result = rag_service.query_alumni(
-            question=request.question,
-            session_id=request.session_id
-        )
+        with tracing(_timing_requested(http_request)) as trace:
+            result = await rag_service.aquery_alumni(
+                question=request.question,
+                session_id=request.session_id
+            )
 
         return QueryResponse(
             success=result["success"],
             answer=result["answer"],
             session_id=request.session_id,
-            error=result.get("error")
+            error=result.get("error"),
+            timing=trace.summary() if trace is not None else None
         )
         
     except Exception as e:
         logger.error(f"Error processing query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/query/stream")
+async def stream_query_alumni(request: QueryRequest, http_request: Request):
+    """
+    Query the alumni database and stream the answer as server-sent events
+    
+    Each generated token is sent as a `data: {"token": ...}` event, followed
+    by a final `done` event (or an `error` event if generation fails).
+    The full exchange is recorded in the session's conversation history.
+    With `X-Debug-Timing: 1` (or `?debug=true`) a `timing` event with the
+    stage breakdown precedes `done`.
+    """
+    logger.info(f"Streaming query: {request.question[:50]}...")
+    timing_requested = _timing_requested(http_request)
+    
+    async def event_stream():
+        try:
+            with tracing(timing_requested) as trace:
+                async for token in rag_service.astream_alumni(
+                    question=request.question,
+                    session_id=request.session_id
+                ):
+                    yield _sse_event({"token": token})
+            if trace is not None:
+                yield _sse_event(trace.summary(), event="timing")
+            yield _sse_event({"session_id": request.session_id}, event="done")
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+            yield _sse_event({"error": str(e), "session_id": request.session_id}, event="error")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.post("/alumni", response_model=AddAlumniResponse)
 async def add_alumni(request: AddAlumniRequest, background_tasks: BackgroundTasks):
     """
@@ -136,16 +384,10 @@ async def add_alumni(request: AddAlumniRequest, background_tasks: BackgroundTask
     try:
         logger.info(f"Adding new alumni: {request.name}")
         
-        # Convert request to dict, excluding None values
-        alumni_data = request.model_dump(exclude_none=True)
-        
-        # If additional_info is provided, merge it into the main document
-        if alumni_data.get('additional_info'):
-            additional_info = alumni_data.pop('additional_info')
-            alumni_data.update(additional_info)
+        alumni_data = _alumni_request_to_document(request)
         
         # Add alumni and embed
-        alumni_id = rag_service.add_alumni_and_embed(alumni_data)
+        alumni_id = await run_blocking(rag_service.add_alumni_and_embed, alumni_data)
         
         return AddAlumniResponse(
             success=True,
@@ -161,13 +403,117 @@ async def add_alumni(request: AddAlumniRequest, background_tasks: BackgroundTask
             error=str(e)
         )
 
+@app.post("/alumni/bulk", response_model=BulkAddAlumniResponse)
+async def add_alumni_bulk(request: Request, response: Response):
+    """
+    Add many alumni at once
+    
+    Accepts a JSON array of alumni records, or NDJSON (one record per line,
+    Content-Type: application/x-ndjson). Records are inserted with a single
+    insert_many, embedded in batches and the index is saved once. Invalid
+    or rejected records are reported by their position in the input and
+    do not stop the others. If indexing fails after the records are
+    stored, their ids are returned with status 202 and indexing_pending:
+    they become searchable with the next background refresh, so the
+    request must not be retried.
+    """
+    records = await _read_bulk_records(request)
+    
+    failures: Dict[int, str] = {}
+    positions, documents = [], []
+    for index, record in enumerate(records):
+        try:
+            if isinstance(record, bytes):
+                record = json.loads(record)
+            alumni = AddAlumniRequest.model_validate(record)
+        except (ValueError, ValidationError) as e:
+            failures[index] = str(e)
+            continue
+        positions.append(index)
+        documents.append(_alumni_request_to_document(alumni))
+    
+    alumni_ids: Dict[int, str] = {}
+    error = index_error = None
+    try:
+        logger.info(f"Bulk adding {len(documents)} alumni ({len(failures)} invalid)")
+        inserted, failed, index_error = await run_blocking(rag_service.add_alumni_bulk, documents)
+        alumni_ids = {positions[position]: alumni_id for position, alumni_id in inserted.items()}
+        failures.update({positions[position]: message for position, message in failed.items()})
+    except Exception as e:
+        logger.error(f"Error bulk adding alumni: {e}")
+        error = str(e)
+    
+    if error is not None:
+        summary = "Failed to add alumni"
+    elif index_error is not None:
+        response.status_code = 202
+        summary = f"Stored {len(alumni_ids)} of {len(records)} alumni; indexing is pending"
+    else:
+        summary = f"Added {len(alumni_ids)} of {len(records)} alumni"
+    return BulkAddAlumniResponse(
+        success=error is None and index_error is None and not failures,
+        inserted=len(alumni_ids),
+        failed=len(failures),
+        alumni_ids=alumni_ids,
+        failures=[BulkAlumniFailure(index=index, error=message) for index, message in sorted(failures.items())],
+        indexing_pending=index_error is not None,
+        message=summary,
+        error=error or index_error
+    )
+
+@app.put("/alumni/{alumni_id}", response_model=AddAlumniResponse)
+async def upsert_alumni(alumni_id: str, request: AddAlumniRequest):
+    """
+    Replace an alumni record (or create it under the given ID)
+    
+    The alumni's vector is replaced in place, so edits never leave stale
+    duplicates in the search index.
+    """
+    try:
+        logger.info(f"Upserting alumni {alumni_id}: {request.name}")
+        
+        alumni_data = _alumni_request_to_document(request)
+        replaced = await run_blocking(rag_service.upsert_alumni, alumni_id, alumni_data)
+        
+        return AddAlumniResponse(
+            success=True,
+            alumni_id=alumni_id,
+            message=f"Alumni {request.name} {'updated' if replaced else 'added'} and re-embedded for search"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error upserting alumni: {e}")
+        return AddAlumniResponse(
+            success=False,
+            alumni_id=alumni_id,
+            message="Failed to upsert alumni",
+            error=str(e)
+        )
+
+@app.delete("/alumni/{alumni_id}")
+async def delete_alumni(alumni_id: str):
+    """
+    Delete an alumni record and remove it from the search index
+    """
+    try:
+        success = await run_blocking(rag_service.delete_alumni, alumni_id)
+        
+        if success:
+            return {"message": f"Alumni deleted: {alumni_id}"}
+        else:
+            return {"message": f"No alumni found with ID: {alumni_id}"}
+            
+    except Exception as e:
+        logger.error(f"Error deleting alumni: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/conversation/{session_id}", response_model=ConversationHistoryResponse)
 async def get_conversation_history(session_id: str):
     """
     Get conversation history for a specific session
     """
     try:
-        messages = rag_service.get_conversation_history(session_id)
+        messages = await run_blocking(rag_service.get_conversation_history, session_id)
         
         return ConversationHistoryResponse(
             success=True,
@@ -185,7 +531,7 @@ async def clear_conversation(session_id: str):
     Clear conversation history for a specific session
     """
     try:
-        success = rag_service.clear_conversation(session_id)
+        success = await run_blocking(rag_service.clear_conversation, session_id)
         
         if success:
             return {"message": f"Conversation history cleared for session: {session_id}"}
@@ -197,16 +543,18 @@ async def clear_conversation(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/update-embeddings")
-async def force_update_embeddings():
+async def force_update_embeddings(full: bool = False):
     """
     Manually trigger an update of the vector embeddings
     
     Useful when you've added alumni through other means and want to
-    ensure the search index is up to date.
+    ensure the search index is up to date. Only changed alumni are
+    re-embedded unless **full** is set, which rebuilds the whole index
+    (e.g. after deleting alumni directly in MongoDB).
     """
     try:
         logger.info("Manually triggering embeddings update...")
-        success = rag_service.update_vectorstore()
+        success = await run_blocking(rag_service.update_vectorstore, full=full)
         
         if success:
             return {"message": "Embeddings updated successfully"}
@@ -217,16 +565,39 @@ async def force_update_embeddings():
         logger.error(f"Error updating embeddings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/health/live", response_model=LivenessResponse)
+async def liveness():
+    """
+    Liveness probe: the process is up and serving requests (no dependency checks)
+    """
+    return LivenessResponse(status="alive")
+
+@app.get("/health/ready", response_model=ReadinessResponse)
+async def readiness(response: Response):
+    """
+    Readiness probe: 503 until the service is initialized and warmed up, and
+    unless every component passed its last background check
+    """
+    components = rag_service.health.results()
+    if not rag_service.ready:
+        response.status_code = 503
+        return ReadinessResponse(status="starting", startup=rag_service.startup, components=components)
+    ready = all(component["status"] == "healthy" for component in components.values())
+    if not ready:
+        response.status_code = 503
+    return ReadinessResponse(status="ready" if ready else "not_ready", startup=rag_service.startup,
+                             components=components)
+
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
     """
-    Check the health status of all services
+    Health status of all services, from the last background component checks
     """
     try:
-        health = rag_service.health_check()
+        health = await run_blocking(rag_service.health_check)
         
         status = "healthy" if all(
-            service == "healthy" for service in [health["mongodb"], health["vectorstore"]]
+            component["status"] == "healthy" for component in health["components"].values()
         ) else "unhealthy"
         
         return HealthCheckResponse(
@@ -238,6 +609,43 @@ async def health_check():
         logger.error(f"Error in health check: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics: per-stage latency histograms, query and token counters, index and session gauges
+    """
+    body = await run_blocking(rag_service.metrics.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.post("/admin/profile")
+async def profile_service(
+    request: Request,
+    seconds: float = Query(10, gt=0, description="Length of the profiling window"),
+    cpu: bool = Query(True, description="Sample the stacks of all threads"),
+    memory: bool = Query(True, description="Compare tracemalloc snapshots taken around the window"),
+    interval_ms: float = Query(5, ge=1, le=1000, description="CPU sampling interval"),
+    include_idle: bool = Query(False, description="Also report threads blocked waiting for work")
+):
+    """
+    Profile the running service for a bounded window (requires X-Admin-Token)
+    
+    Requests keep being served meanwhile, so send the slow traffic during
+    the window. One profile runs at a time.
+    """
+    _require_admin(request)
+    if seconds > PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"At most {PROFILE_MAX_SECONDS:g} seconds per profile")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already being captured")
+    
+    async with _profile_lock:
+        logger.info(f"Profiling service for {seconds:g}s (cpu={cpu}, memory={memory})")
+        result = await asyncio.to_thread(
+            capture_profile, seconds, cpu=cpu, memory=memory, interval=interval_ms / 1000,
+            include_idle=include_idle
+        )
+    return {"success": True, **result}
+
 @app.get("/")
 async def root():
     """
@@ -249,11 +657,19 @@ async def root():
         "description": "AI-powered question answering for Alumni Management System",
         "endpoints": {
             "query": "POST /query - Ask questions about alumni",
+            "query_stream": "POST /query/stream - Ask questions and stream the answer (SSE)",
             "add_alumni": "POST /alumni - Add new alumni",
+            "bulk_add_alumni": "POST /alumni/bulk - Add many alumni (JSON array or NDJSON)",
+            "upsert_alumni": "PUT /alumni/{alumni_id} - Replace an alumni record",
+            "delete_alumni": "DELETE /alumni/{alumni_id} - Delete an alumni record",
             "conversation_history": "GET /conversation/{session_id} - Get chat history",
             "clear_conversation": "DELETE /conversation/{session_id} - Clear chat history",
             "update_embeddings": "POST /update-embeddings - Force update search index",
             "health": "GET /health - Check service health",
+            "liveness": "GET /health/live - Liveness probe",
+            "readiness": "GET /health/ready - Readiness probe (503 while starting or when not ready)",
+            "metrics": "GET /metrics - Prometheus metrics",
+            "profile": "POST /admin/profile - Capture a CPU and memory profile (admin)",
             "docs": "GET /docs - Interactive API documentation"
         }
     }
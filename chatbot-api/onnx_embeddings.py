@@ -0,0 +1,127 @@
+# onnx_embeddings.py
+"""
+Sentence embeddings from an exported ONNX model, run on CPU with
+onnxruntime.
+
+Uses the same sentence-transformers model repository as the PyTorch
+backend: its tokenizer, pooling and normalization settings are read from
+the repository, so vectors match the PyTorch ones up to quantization
+error. Needs neither torch nor sentence-transformers at runtime.
+
+Repositories such as all-MiniLM-L6-v2 ship exports under onnx/, including
+int8-quantized ones per instruction set (model_quint8_avx2.onnx,
+model_qint8_avx512_vnni.onnx, model_qint8_arm64.onnx, ...). A local
+directory laid out the same way works too.
+"""
+
+import json
+import os
+import platform
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def default_model_file() -> str:
+    """int8 export that runs on any CPU of this architecture"""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+class ONNXEmbeddings(Embeddings):
+    """Pooled (and normalized, if the model is) embeddings of an ONNX export"""
+
+    def __init__(self, model_name: str, file_name: Optional[str] = None, num_threads: int = 0,
+                 batch_size: int = 32):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The onnx embeddings backend needs onnxruntime and tokenizers installed") from e
+
+        self.model_name = model_name
+        self.file_name = file_name or default_model_file()
+        self.batch_size = batch_size
+
+        # Both the classic sentence-transformers config layout and the newer one
+        modules = self._read_json("modules.json") or []
+        pooling = self._read_json("1_Pooling/config.json") or {}
+        config = self._read_json("sentence_bert_config.json") or {}
+        tokenizer_config = self._read_json("tokenizer_config.json") or {}
+        cls_pooling = pooling.get("pooling_mode_cls_token") or pooling.get("pooling_mode") == "cls"
+        self.pooling = "cls" if cls_pooling else "mean"
+        self.normalize = any(module.get("type", "").endswith("Normalize") for module in modules)
+        max_length = config.get("max_seq_length") or tokenizer_config.get("model_max_length")
+        self.max_length = max_length if max_length and max_length < 100000 else 512
+
+        self.tokenizer = Tokenizer.from_file(self._fetch("tokenizer.json"))
+        self.tokenizer.enable_truncation(self.max_length)
+        pad_token = tokenizer_config.get("pad_token", "[PAD]")
+        if isinstance(pad_token, dict):
+            pad_token = pad_token.get("content", "[PAD]")
+        # Pads each batch to its longest text only
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            self._fetch(self.file_name), options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {node.name for node in self.session.get_inputs()}
+        outputs = [node.name for node in self.session.get_outputs()]
+        self._output = "last_hidden_state" if "last_hidden_state" in outputs else outputs[0]
+
+    def _fetch(self, relative_path: str) -> str:
+        """Local path of a repository file, downloading it from the Hub if needed"""
+        if os.path.isdir(self.model_name):
+            path = os.path.join(self.model_name, relative_path)
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            return path
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(self.model_name, relative_path)
+
+    def _read_json(self, relative_path: str) -> Optional[Any]:
+        """An optional repository config file, or None"""
+        try:
+            with open(self._fetch(relative_path)) as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs: Dict[str, np.ndarray] = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": mask
+        }
+        if "token_type_ids" in self._inputs:
+            inputs["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        hidden = self.session.run([self._output], inputs)[0]
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            weights = mask[:, :, None].astype(hidden.dtype)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        # Texts of similar length batched together need less padding
+        order = sorted(range(len(texts)), key=lambda position: len(texts[position]))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for position, vector in zip(batch, self._embed_batch([texts[position] for position in batch])):
+                vectors[position] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
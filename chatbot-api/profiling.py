@@ -0,0 +1,146 @@
+# profiling.py
+"""
+On-demand profiling of the running service.
+
+CPU: a sampling profiler that records the stacks of all threads every few
+milliseconds (cProfile only sees the thread that enabled it, and the
+service's work runs in executor threads). Stacks are reported as top
+functions and in collapsed form, ready for flamegraph tools.
+
+Memory: tracemalloc snapshots at the start and end of the window; reports
+the largest allocation sites and what grew during the window.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List
+
+# Allocations made by the profiler itself are not reported
+_THIS_FILE = os.path.abspath(__file__)
+
+# Innermost Python frames of threads blocked waiting for work (executor
+# workers, the event loop's selector, condition waits); counted apart
+IDLE_FRAMES = {
+    ("thread.py", "_worker"),
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_cpu(seconds: float, interval: float = 0.005, top: int = 30, include_idle: bool = False) -> Dict[str, Any]:
+    """Sample every thread's stack for seconds; blocks the calling thread"""
+    own_thread = threading.get_ident()
+    stacks = Counter()
+    samples = idle_samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            if not include_idle and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                idle_samples += 1
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                stacks[tuple(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    self_counts, total_counts = Counter(), Counter()
+    for stack, count in stacks.items():
+        self_counts[stack[-1]] += count
+        for label in set(stack):
+            total_counts[label] += count
+    thread_samples = sum(stacks.values()) or 1
+
+    def ranked(counts: Counter) -> List[Dict[str, Any]]:
+        return [
+            {"function": label, "samples": count, "percent": round(100 * count / thread_samples, 2)}
+            for label, count in counts.most_common(top)
+        ]
+
+    return {
+        "seconds": seconds,
+        "interval_ms": interval * 1000,
+        "samples": samples,
+        "thread_samples": thread_samples,
+        "idle_thread_samples": idle_samples,
+        "top_self": ranked(self_counts),
+        "top_cumulative": ranked(total_counts),
+        "collapsed_stacks": [
+            {"stack": ";".join(stack), "samples": count} for stack, count in stacks.most_common(top * 10)
+        ]
+    }
+
+
+class MemoryWindow:
+    """tracemalloc over a window; starts tracing if it is not already on"""
+
+    def __init__(self, frames: int = 10):
+        self.frames = frames
+        self._started_tracing = False
+        self._before = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot()
+
+    def stop(self, top: int = 30) -> Dict[str, Any]:
+        try:
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, _THIS_FILE)]
+        after = after.filter_traces(ignore)
+
+        return {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            # Allocations made before tracing started are invisible to tracemalloc
+            "tracing_started_for_window": self._started_tracing,
+            "top_allocations": [
+                {"location": str(stat.traceback[0]), "size_bytes": stat.size, "count": stat.count}
+                for stat in after.statistics("lineno")[:top]
+            ],
+            "top_growth": [
+                {"location": str(stat.traceback[0]), "size_diff_bytes": stat.size_diff,
+                 "count_diff": stat.count_diff, "size_bytes": stat.size}
+                for stat in after.compare_to(self._before.filter_traces(ignore), "lineno")[:top]
+            ]
+        }
+
+
+def capture_profile(seconds: float, cpu: bool = True, memory: bool = True,
+                    interval: float = 0.005, top: int = 30, include_idle: bool = False) -> Dict[str, Any]:
+    """Profile the process for a window of seconds; blocks the calling thread"""
+    window = MemoryWindow() if memory else None
+    if window is not None:
+        window.start()
+    result = {}
+    try:
+        if cpu:
+            result["cpu"] = sample_cpu(seconds, interval=interval, top=top, include_idle=include_idle)
+        else:
+            time.sleep(seconds)
+    finally:
+        if window is not None:
+            result["memory"] = window.stop(top=top)
+    return result
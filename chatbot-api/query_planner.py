@@ -0,0 +1,128 @@
+# query_planner.py
+"""
+Lightweight planner that turns structured constraints in a question into
+a MongoDB filter over the indexed alumni fields.
+
+"Who graduated before 2019?" becomes {"graduation_year": {"$lt": 2019}},
+"Who works at Google or Amazon?" becomes {"company": {"$in": [...]}}.
+Known companies, departments, skills and locations are read from MongoDB
+with distinct() and matched as whole words in the question.
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+GRADUATION_PATTERN = re.compile(r"graduat|batch|class of|passed out", re.IGNORECASE)
+YEAR = r"((?:19|20)\d{2})"
+YEAR_RANGE_PATTERN = re.compile(rf"(?:between|from)\s+{YEAR}\s+(?:and|to|-)\s+{YEAR}", re.IGNORECASE)
+YEAR_BEFORE_PATTERN = re.compile(rf"(?:before|earlier than|prior to)\s+{YEAR}", re.IGNORECASE)
+YEAR_AFTER_PATTERN = re.compile(rf"(?:after|later than)\s+{YEAR}", re.IGNORECASE)
+YEAR_SINCE_PATTERN = re.compile(rf"since\s+{YEAR}", re.IGNORECASE)
+YEAR_PATTERN = re.compile(rf"\b{YEAR}\b")
+
+
+class QueryPlanner:
+    """Extract structured Mongo filters from natural-language questions"""
+
+    term_fields = ("company", "department", "skills")
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._matchers: Dict[str, List] = {}
+
+    def refresh(self):
+        """Reload the known field values from MongoDB"""
+        matchers = {}
+        for field in self.term_fields:
+            matchers[field] = self._compile_matchers(self._distinct(field))
+
+        # Locations are free text ("Bangalore, Karnataka"), so match their parts
+        parts = set()
+        for location in self._distinct("location"):
+            parts.update(part.strip() for part in location.split(","))
+        matchers["location"] = self._compile_matchers(parts)
+
+        self._matchers = matchers
+        logger.info("Query planner refreshed known field values")
+
+    def _distinct(self, field: str) -> List[str]:
+        try:
+            return [value for value in self.collection.distinct(field) if isinstance(value, str) and value.strip()]
+        except Exception as e:
+            logger.error(f"Error loading distinct values for {field}: {e}")
+            return []
+
+    @staticmethod
+    def _compile_matchers(values) -> List:
+        """Whole-word regexes: case-insensitive, except for very short values
+        ("Go", "R", "IT") which would otherwise match ordinary words"""
+        long_values = sorted((v for v in values if len(v) > 2), key=len, reverse=True)
+        short_values = sorted(v for v in values if len(v) <= 2)
+
+        matchers = []
+        if long_values:
+            lookup = {value.lower(): value for value in long_values}
+            pattern = re.compile(r"(?<!\w)(" + "|".join(map(re.escape, long_values)) + r")(?!\w)", re.IGNORECASE)
+            matchers.append((pattern, lambda match, lookup=lookup: lookup[match.lower()]))
+        if short_values:
+            pattern = re.compile(r"(?<!\w)(" + "|".join(map(re.escape, short_values)) + r")(?!\w)")
+            matchers.append((pattern, lambda match: match))
+        return matchers
+
+    def _match_values(self, field: str, question: str) -> List[str]:
+        found = []
+        for pattern, resolve in self._matchers.get(field, []):
+            for match in pattern.findall(question):
+                value = resolve(match)
+                if value not in found:
+                    found.append(value)
+        return found
+
+    def plan(self, question: str) -> Optional[Dict[str, Any]]:
+        """Mongo filter for the structured constraints in question, or None"""
+        clauses = []
+
+        year_filter = self._graduation_year_filter(question)
+        if year_filter is not None:
+            clauses.append({"graduation_year": year_filter})
+
+        for field in self.term_fields:
+            values = self._match_values(field, question)
+            if values:
+                clauses.append({field: {"$in": values}})
+
+        locations = self._match_values("location", question)
+        if locations:
+            pattern = "|".join(re.escape(location) for location in locations)
+            clauses.append({"location": {"$regex": pattern, "$options": "i"}})
+
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    @staticmethod
+    def _graduation_year_filter(question: str) -> Optional[Dict[str, Any]]:
+        if not GRADUATION_PATTERN.search(question):
+            return None
+
+        match = YEAR_RANGE_PATTERN.search(question)
+        if match:
+            low, high = sorted(int(year) for year in match.groups())
+            return {"$gte": low, "$lte": high}
+        match = YEAR_BEFORE_PATTERN.search(question)
+        if match:
+            return {"$lt": int(match.group(1))}
+        match = YEAR_AFTER_PATTERN.search(question)
+        if match:
+            return {"$gt": int(match.group(1))}
+        match = YEAR_SINCE_PATTERN.search(question)
+        if match:
+            return {"$gte": int(match.group(1))}
+
+        years = sorted({int(year) for year in YEAR_PATTERN.findall(question)})
+        if years:
+            return {"$in": years}
+        return None
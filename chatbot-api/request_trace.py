@@ -0,0 +1,62 @@
+# request_trace.py
+"""
+Opt-in per-request stage timing.
+
+A trace is bound to the current context for the duration of one request;
+pipeline stages record into it when one is active. Context variables are
+copied into the executor threads LangChain runs sync steps in, so stages
+timed there land in the same trace.
+"""
+
+import time
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+_current: ContextVar[Optional["RequestTrace"]] = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    """Stage timings and details collected while answering one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.details: Dict[str, Any] = {}
+
+    def add_stage(self, stage: str, seconds: float):
+        self.stages.append({
+            "stage": stage,
+            "start_ms": round((time.perf_counter() - seconds - self.started) * 1000, 3),
+            "duration_ms": round(seconds * 1000, 3)
+        })
+
+    def note(self, **details):
+        self.details.update(details)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages": sorted(self.stages, key=lambda stage: stage["start_ms"]),
+            **self.details
+        }
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+@contextmanager
+def tracing(enabled: bool = True) -> Iterator[Optional[RequestTrace]]:
+    """Bind a new trace to the current context (or yield None if not enabled)"""
+    if not enabled:
+        yield None
+        return
+    trace = RequestTrace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        # A streaming response may be closed from another context
+        with suppress(ValueError):
+            _current.reset(token)
@@ -0,0 +1,317 @@
+# session_store.py
+"""
+Bounded conversation session stores.
+
+Sessions are evicted least-recently-used once SESSION_MAX_SESSIONS is
+reached and after SESSION_TTL seconds idle; each keeps only its last
+SESSION_MAX_MESSAGES messages.
+
+  sqlite  (default) histories kept in a SQLite file; they survive
+          restarts, are shared by all API workers on the host, and only the
+          session being answered is read into memory
+  memory  histories held in process memory, also bounded by
+          SESSION_MAX_BYTES; only for a single API worker, since each
+          worker would keep its own sessions
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+logger = logging.getLogger(__name__)
+
+SESSION_BACKENDS = ("memory", "sqlite")
+
+
+def _message_size(message: BaseMessage) -> int:
+    """Approximate footprint of a message: its serialized length in bytes"""
+    return len(json.dumps(message_to_dict(message), ensure_ascii=False).encode("utf-8"))
+
+
+class SessionHistory(BaseChatMessageHistory):
+    """Chat history view of one session in a session store"""
+
+    def __init__(self, store, session_id: str):
+        self.store = store
+        self.session_id = session_id
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return self.store.get_messages(self.session_id)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.store.add_messages(self.session_id, messages)
+
+    def clear(self) -> None:
+        self.store.clear(self.session_id)
+
+
+class MemorySessionStore:
+    """Thread-safe in-memory sessions with LRU, idle-TTL and byte-budget eviction"""
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 3600, max_messages: int = 50,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._sessions = OrderedDict()  # session_id -> [messages, sizes, last_used]
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def history(self, session_id: str) -> SessionHistory:
+        return SessionHistory(self, session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            self._evict_expired()
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict_expired()
+            return len(self._sessions)
+
+    def get_messages(self, session_id: str) -> List[BaseMessage]:
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            session[2] = time.monotonic()
+            self._sessions.move_to_end(session_id)
+            return list(session[0])
+
+    def add_messages(self, session_id: str, messages: Sequence[BaseMessage]):
+        """Append messages, dropping the session's oldest beyond max_messages"""
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = [[], [], 0.0]
+            session[2] = time.monotonic()
+            self._sessions.move_to_end(session_id)
+
+            for message in messages:
+                size = _message_size(message)
+                session[0].append(message)
+                session[1].append(size)
+                self._bytes += size
+            while len(session[0]) > self.max_messages:
+                session[0].pop(0)
+                self._bytes -= session[1].pop(0)
+
+            while self._sessions and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+                evicted_id, _ = next(iter(self._sessions.items()))
+                if evicted_id == session_id and len(self._sessions) == 1:
+                    break  # Never evict the session being written
+                self._remove(evicted_id)
+                self.evictions += 1
+
+    def clear(self, session_id: str) -> bool:
+        """Drop a session; returns whether it existed"""
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id)
+            return True
+
+    def _remove(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self._bytes -= sum(session[1])
+
+    def _evict_expired(self):
+        """Sessions are ordered by last use, so expired ones are at the front"""
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session[2] > cutoff:
+                break
+            self._remove(session_id)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._evict_expired()
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "messages": sum(len(session[0]) for session in self._sessions.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "ttl_seconds": self.ttl
+            }
+
+
+class SQLiteSessionStore:
+    """Sessions persisted in SQLite with LRU and idle-TTL eviction"""
+
+    # Expired sessions are purged at most this often
+    purge_interval = 60
+
+    def __init__(self, path: str, max_sessions: int = 10000, ttl: float = 3600, max_messages: int = 50):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.evictions = 0
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Several API workers may share the file; WAL lets them read while one writes
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_used ON sessions (last_used)")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                message TEXT NOT NULL,
+                size INTEGER NOT NULL
+            )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id)")
+        self._conn.commit()
+
+    def history(self, session_id: str) -> SessionHistory:
+        return SessionHistory(self, session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ? AND last_used > ?",
+                (session_id, time.time() - self.ttl)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE last_used > ?", (time.time() - self.ttl,)
+            ).fetchone()[0]
+
+    def get_messages(self, session_id: str) -> List[BaseMessage]:
+        now = time.time()
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE sessions SET last_used = ? WHERE session_id = ? AND last_used > ?",
+                (now, session_id, now - self.ttl)
+            ).rowcount
+            if not updated:
+                return []
+            rows = self._conn.execute(
+                "SELECT message FROM messages WHERE session_id = ? ORDER BY id", (session_id,)
+            ).fetchall()
+            self._conn.commit()
+        return messages_from_dict([json.loads(row[0]) for row in rows])
+
+    def add_messages(self, session_id: str, messages: Sequence[BaseMessage]):
+        """Append messages, dropping the session's oldest beyond max_messages"""
+        now = time.time()
+        rows = []
+        for message in messages:
+            serialized = json.dumps(message_to_dict(message), ensure_ascii=False)
+            rows.append((session_id, serialized, len(serialized.encode("utf-8"))))
+
+        with self._lock:
+            self._purge_expired(now)
+            existing = self._conn.execute(
+                "SELECT last_used FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if existing is not None and existing[0] <= now - self.ttl:
+                self._delete(session_id)
+                self.evictions += 1
+                existing = None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, last_used) VALUES (?, ?)", (session_id, now)
+            )
+            self._conn.executemany("INSERT INTO messages (session_id, message, size) VALUES (?, ?, ?)", rows)
+            self._conn.execute('''
+                DELETE FROM messages WHERE session_id = ? AND id NOT IN (
+                    SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?
+                )
+            ''', (session_id, session_id, self.max_messages))
+
+            if existing is None:
+                overflow = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_sessions
+                if overflow > 0:
+                    evicted = self._conn.execute(
+                        "SELECT session_id FROM sessions WHERE session_id != ? ORDER BY last_used LIMIT ?",
+                        (session_id, overflow)
+                    ).fetchall()
+                    for (evicted_id,) in evicted:
+                        self._delete(evicted_id)
+                    self.evictions += len(evicted)
+            self._conn.commit()
+
+    def clear(self, session_id: str) -> bool:
+        """Drop a session; returns whether it existed"""
+        with self._lock:
+            existed = self._delete(session_id)
+            self._conn.commit()
+        return existed
+
+    def _delete(self, session_id: str) -> bool:
+        self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        return self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+
+    def _purge_expired(self, now: float):
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        cutoff = now - self.ttl
+        self._conn.execute(
+            "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE last_used <= ?)",
+            (cutoff,)
+        )
+        self.evictions += self._conn.execute("DELETE FROM sessions WHERE last_used <= ?", (cutoff,)).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cutoff = time.time() - self.ttl
+            sessions = self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE last_used > ?", (cutoff,)
+            ).fetchone()[0]
+            messages, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM messages"
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "sessions": sessions,
+            "max_sessions": self.max_sessions,
+            "messages": messages,
+            "bytes": size,
+            "evictions": self.evictions,
+            "ttl_seconds": self.ttl
+        }
+
+
+def create_session_store(backend: str, path: str, max_sessions: int, ttl: float, max_messages: int,
+                         max_bytes: int):
+    """Session store for the configured SESSION_BACKEND"""
+    if backend == "sqlite":
+        return SQLiteSessionStore(path, max_sessions=max_sessions, ttl=ttl, max_messages=max_messages)
+    if backend == "memory":
+        return MemorySessionStore(max_sessions=max_sessions, ttl=ttl, max_messages=max_messages,
+                                  max_bytes=max_bytes)
+    raise ValueError(f"Unknown SESSION_BACKEND {backend!r}, expected one of {SESSION_BACKENDS}")
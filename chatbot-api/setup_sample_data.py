@@ -375,6 +375,9 @@ def setup_mongodb_with_sample_data():
         collection.create_index("company")
         collection.create_index("department")
         collection.create_index("skills")
+        # The chatbot finds documents to re-index by these timestamps
+        collection.create_index("updated_at")
+        collection.create_index("created_at")
         
         # Display some stats
         total_docs = collection.count_documents({})
@@ -0,0 +1,74 @@
+# shared_index.py
+"""
+Coordination between API worker processes that serve the same on-disk index.
+
+Every worker holds its own copy of the vector store. Writers take an
+exclusive file lock, catch up with the published index, apply their change,
+save it and bump a version counter kept next to the index files. Readers
+poll the counter and reload from disk when another worker has published a
+newer version.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single worker is assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SharedIndexVersion:
+    """Inter-process writer lock and published version of one index"""
+
+    def __init__(self, index_path: str):
+        self.lock_path = f"{index_path}.lock"
+        self.version_path = f"{index_path}.version"
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._lock_file = None
+        if fcntl is None:
+            logger.warning("fcntl is unavailable; index writes are not coordinated across processes")
+
+    def current(self) -> int:
+        """Latest version published by any worker"""
+        try:
+            with open(self.version_path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def publish(self) -> int:
+        """Bump the published version; the caller must hold writer_lock()"""
+        version = self.current() + 1
+        temp_path = f"{self.version_path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(version))
+        os.replace(temp_path, self.version_path)
+        return version
+
+    @contextmanager
+    def writer_lock(self):
+        """Exclusive across processes, re-entrant within one"""
+        with self._lock:
+            if self._depth == 0:
+                directory = os.path.dirname(self.lock_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._lock_file = open(self.lock_path, "a")
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
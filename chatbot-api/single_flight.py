@@ -0,0 +1,85 @@
+# single_flight.py
+"""
+Single-flight execution: concurrent calls with the same key share one run
+of the work, and every caller gets its result (or its exception).
+
+Keys are only held while the work runs; a call arriving after it finished
+starts a new run, so results are never served stale from here (the answer
+cache covers repeats).
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """For threads: the first caller of a key runs the work, the others block until it is done"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """fn() once among concurrent callers of key; returns (result, whether this caller ran it)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """For coroutines on one event loop: callers of a key await the same task"""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """await work() once among concurrent callers of key; returns (result, whether this caller started it)"""
+        task = self._tasks.get(key)
+        leader = task is None
+        if leader:
+            task = self._tasks[key] = asyncio.ensure_future(work())
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+        # A caller that is cancelled (e.g. its client disconnected) must not
+        # cancel the work the other callers are waiting for
+        return await asyncio.shield(task), leader
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Retrieved here in case every caller was cancelled before it failed
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
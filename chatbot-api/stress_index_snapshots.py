@@ -0,0 +1,204 @@
+# stress_index_snapshots.py
+"""
+Stress check for lock-free index reads.
+
+Writer threads add, update and delete alumni while reader threads search
+whichever index snapshot is current. Every snapshot a reader sees must be
+internally consistent: as many vectors as mapped ids, and every hit
+resolvable in the docstore, and the text of a hit the writers never touch
+must find it again.
+Exits non-zero on any violation.
+
+Each FAISS_INDEX_TYPE (flat and ivf_flat by default) runs in its own
+process against a fresh index directory. IVF runs first add enough seed
+alumni to train on. Run against a MongoDB you can write to (see
+setup_sample_data.py):
+    python stress_index_snapshots.py [seconds] [readers] [writers] [index_type ...]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import threading
+import subprocess
+from collections import Counter
+import numpy as np
+import ann_index
+from chatbot import AlumniRAGService, PLACEHOLDER_ID, TOMBSTONE_ID
+
+QUERIES = [
+    "Who works at Google?",
+    "Find machine learning experts",
+    "Which alumni are in Bangalore?",
+    "Who graduated in 2020?",
+    "stress test alumni",
+]
+
+
+def check_snapshot(snapshot, question, volatile=frozenset()):
+    """Problems found in one published snapshot, searched for question.
+
+    Documents in volatile may have been rewritten since the snapshot (the
+    SQLite docstore is shared by all of them), so their text is not searched.
+    """
+    problems = []
+    vectorstore = snapshot.vectorstore
+    if vectorstore.index.ntotal != len(vectorstore.index_to_docstore_id):
+        problems.append(
+            f"v{snapshot.version}: {vectorstore.index.ntotal} vectors but "
+            f"{len(vectorstore.index_to_docstore_id)} mapped ids"
+        )
+    embedding = vectorstore.embedding_function.embed_query(question)
+    _, positions = vectorstore.index.search(np.array([embedding], dtype="float32"), 10)
+    for position in positions[0]:
+        if position == -1:
+            continue
+        doc_id = vectorstore.index_to_docstore_id.get(int(position))
+        if doc_id is None:
+            problems.append(f"v{snapshot.version}: position {position} has no mapped id")
+        elif doc_id not in (PLACEHOLDER_ID, TOMBSTONE_ID):
+            doc = vectorstore.docstore.search(doc_id)
+            if not hasattr(doc, "page_content"):
+                problems.append(f"v{snapshot.version}: {doc_id} missing from docstore")
+            elif doc_id not in volatile and not finds_itself(vectorstore, doc_id, doc.page_content):
+                problems.append(f"v{snapshot.version}: {doc_id} not found by its own text")
+    for doc_id, _ in snapshot.lexical_index.search(question, k=10):
+        if not hasattr(vectorstore.docstore.search(doc_id), "page_content"):
+            problems.append(f"v{snapshot.version}: lexical hit {doc_id} missing from docstore")
+    return problems
+
+
+def finds_itself(vectorstore, doc_id, text):
+    """Whether searching a document's own text returns that document"""
+    embedding = vectorstore.embedding_function.embed_query(text)
+    _, positions = vectorstore.index.search(np.array([embedding], dtype="float32"), 10)
+    return any(vectorstore.index_to_docstore_id.get(int(position)) == doc_id for position in positions[0])
+
+
+def seed_training_alumni(service):
+    """Insert enough alumni to train a small IVF index; returns their ids"""
+    from pymongo import MongoClient
+    collection = MongoClient(service.mongo_uri)[service.db_name][service.collection_name]
+    result = collection.insert_many([
+        {
+            "name": f"Stress Seed {number}",
+            "company": random.choice(["Google", "Amazon", "Stress Labs"]),
+            "graduation_year": random.randint(2010, 2024),
+            "skills": ["stress testing"],
+        }
+        for number in range(ann_index.TRAINING_POINTS_PER_LIST * 4)
+    ])
+    return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+
+def run_each(index_types):
+    """Run this check once per index type, each in a fresh process and index directory"""
+    failed = []
+    for index_type in index_types:
+        print(f"🗂️  FAISS_INDEX_TYPE={index_type}")
+        env = dict(os.environ, FAISS_INDEX_TYPE=index_type, VECTORSTORE_DIR=tempfile.mkdtemp(prefix="stress-index-"))
+        if subprocess.call([sys.executable, __file__] + sys.argv[1:4] + [index_type], env=env):
+            failed.append(index_type)
+    if failed:
+        print(f"❌ Violations with {', '.join(failed)}")
+        sys.exit(1)
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    index_types = sys.argv[4:] or ["flat", "ivf_flat"]
+    if len(index_types) > 1 or os.getenv("FAISS_INDEX_TYPE") != index_types[0]:
+        run_each(index_types)
+        return
+
+    print("🤖 Initializing Alumni RAG System...")
+    service = AlumniRAGService()
+    seeded = seed_training_alumni(service) if ann_index.needs_training(index_types[0]) else []
+    service.initialize()  # Only the index is exercised; no model warm-up
+    print(f"   {service.index_stats.get('index_class')} index")
+    stop = threading.Event()
+    counts = Counter()
+    problems = []
+    lock = threading.Lock()
+    created = []
+    written = set()
+
+    def record(key, issues=()):
+        with lock:
+            counts[key] += 1
+            problems.extend(issues)
+
+    def reader():
+        while not stop.is_set():
+            question = random.choice(QUERIES)
+            try:
+                snapshot = service._current
+                with lock:
+                    volatile = frozenset(written)
+                issues = check_snapshot(snapshot, question, volatile)
+                service._hybrid_search(question, snapshot=snapshot)
+                record("reads", issues)
+            except Exception as e:
+                record("read_errors", [f"reader: {e!r}"])
+
+    def writer(number):
+        sequence = 0
+        while not stop.is_set():
+            sequence += 1
+            try:
+                action = random.random()
+                with lock:
+                    target = random.choice(created) if created else None
+                if target is None or action < 0.5:
+                    alumni_id = service.add_alumni_and_embed({
+                        "name": f"Stress Alumni {number}-{sequence}",
+                        "company": random.choice(["Google", "Amazon", "Stress Labs"]),
+                        "graduation_year": random.randint(2010, 2024),
+                        "skills": ["stress testing"],
+                    })
+                    with lock:
+                        created.append(alumni_id)
+                        written.add(alumni_id)
+                    record("adds")
+                elif action < 0.8:
+                    service.upsert_alumni(target, {"name": f"Stress Alumni {target}", "company": "Updated Co"})
+                    record("updates")
+                else:
+                    with lock:
+                        if target in created:
+                            created.remove(target)
+                    service.delete_alumni(target)
+                    record("deletes")
+            except Exception as e:
+                record("write_errors", [f"writer: {e!r}"])
+
+    threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,), daemon=True) for n in range(writers)]
+    print(f"🔥 Running {readers} readers and {writers} writers for {duration:.0f}s...")
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print("🧹 Removing stress records...")
+    for alumni_id in created + seeded:
+        service.delete_alumni(alumni_id)
+    service.flush_index()
+
+    print(f"📊 {dict(counts)}, final index version {service.index_version}")
+    if problems:
+        print(f"❌ {len(problems)} violations, first few:")
+        for problem in problems[:10]:
+            print(f"   {problem}")
+        sys.exit(1)
+    print("✅ Every snapshot read was consistent")
+
+
+if __name__ == "__main__":
+    main()